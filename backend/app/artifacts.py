@@ -0,0 +1,195 @@
+import hashlib
+import json
+import numpy as np
+import os
+import time
+from typing import Callable, Optional, Tuple
+from dotenv import load_dotenv
+from .fileutil import exclusive_lock, write_atomic
+from .neighbors import KnnGraph, refresh_knn_graph
+from .sharding import ShardedIndex, mmap_read_flags, shard_ids_file, shard_index_file
+
+load_dotenv()
+
+# Configuration - an empty directory keeps the original per-process in-memory build
+RAG_ARTIFACT_DIR = os.getenv("RAG_ARTIFACT_DIR", "")
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+INDEX_FILE = "index.faiss"
+KNN_MANIFEST_FILE = "knn.json"
+KNN_FILE = "knn.npy"
+KNN_SCORES_FILE = "knn_scores.npy"
+# The embeddings the graph was built from (a hard link), diffed by the next incremental update
+KNN_BASE_FILE = "knn.base.npy"
+LOCK_FILE = ".build.lock"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Content hash of the dataset file, streamed so large files stay cheap"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SharedArtifacts:
+    """Embedding matrix and FAISS index persisted once and memory-mapped by every worker.
+
+    The first worker to take the build lock encodes the dataset and writes the
+    artifacts; the others block on the lock and then map the finished files
+    read-only, so the pages live once in the OS page cache regardless of the
+    number of uvicorn workers. The similar-founders graph is a separate,
+    later step (load_or_build_knn) so it never delays serving the index.
+    """
+
+    def __init__(self, directory: str, fingerprint: str):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _manifest(self, name: str = MANIFEST_FILE) -> dict:
+        try:
+            with open(self._path(name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _index_files(self, manifest: dict):
+        shards = manifest.get("shards", 0)
+        if not shards:
+            return [INDEX_FILE]
+        return [name for i in range(shards) for name in (shard_index_file(i), shard_ids_file(i))]
+
+    def is_current(self) -> bool:
+        """True when the artifacts on disk were built for this fingerprint"""
+        manifest = self._manifest()
+        return (manifest.get("fingerprint") == self.fingerprint
+                and os.path.exists(self._path(EMBEDDINGS_FILE))
+                and all(os.path.exists(self._path(name)) for name in self._index_files(manifest)))
+
+    def knn_current(self, k: int) -> bool:
+        """True when the neighbour graph on disk matches this fingerprint and k"""
+        manifest = self._manifest(KNN_MANIFEST_FILE)
+        return (manifest.get("fingerprint") == self.fingerprint and manifest.get("k") == k
+                and all(os.path.exists(self._path(name)) for name in (KNN_FILE, KNN_SCORES_FILE)))
+
+    def _build_lock(self):
+        return exclusive_lock(self._path(LOCK_FILE))
+
+    def _write_atomic(self, name: str, write: Callable[[str], None]):
+        write_atomic(self.directory, name, write)
+
+    def map(self):
+        """Map the persisted embeddings and index read-only"""
+        import faiss
+
+        embeddings = np.load(self._path(EMBEDDINGS_FILE), mmap_mode="r")
+        shards = self._manifest().get("shards", 0)
+        if shards:
+            return embeddings, ShardedIndex.load(self.directory, shards, embeddings.shape[1])
+
+        index = faiss.read_index(self._path(INDEX_FILE), mmap_read_flags())
+        return embeddings, index
+
+    def load_or_build(self, build_embeddings: Callable[[], np.ndarray],
+                      build_index: Callable[[np.ndarray], object]) -> Tuple[np.ndarray, object]:
+        """Map current artifacts, building them first if this worker wins the lock"""
+        if not self.is_current():
+            with self._build_lock():
+                # Another worker may have finished the build while we waited
+                if not self.is_current():
+                    self._build(build_embeddings, build_index)
+                else:
+                    print(f"✅ Artifacts built by another worker in {self.directory}")
+        return self.map()
+
+    def _build(self, build_embeddings, build_index):
+        import faiss
+
+        start = time.perf_counter()
+        print(f"🔄 Building shared artifacts in {self.directory} (pid {os.getpid()})...")
+        embeddings = np.ascontiguousarray(build_embeddings(), dtype=np.float32)
+        index = build_index(embeddings)
+
+        def write_embeddings(path):
+            with open(path, "wb") as f:
+                np.save(f, embeddings)
+
+        def write_manifest(path):
+            with open(path, "w") as f:
+                json.dump({
+                    "fingerprint": self.fingerprint,
+                    "rows": int(embeddings.shape[0]),
+                    "dimension": int(embeddings.shape[1]),
+                    "shards": len(index.shards) if isinstance(index, ShardedIndex) else 0,
+                    "created_at": time.time(),
+                }, f, indent=2)
+
+        self._write_atomic(EMBEDDINGS_FILE, write_embeddings)
+        if isinstance(index, ShardedIndex):
+            index.save(self._write_atomic)
+        else:
+            self._write_atomic(INDEX_FILE, lambda path: faiss.write_index(index, path))
+        # The manifest is written last: it is what marks the artifacts as complete
+        self._write_atomic(MANIFEST_FILE, write_manifest)
+        print(f"✅ Shared artifacts built in {time.perf_counter() - start:.2f}s")
+
+    def map_knn(self, k: int) -> Optional[KnnGraph]:
+        """Map the persisted neighbour graph read-only, if it is current"""
+        if not self.knn_current(k):
+            return None
+        return KnnGraph(np.load(self._path(KNN_FILE), mmap_mode="r"),
+                        np.load(self._path(KNN_SCORES_FILE), mmap_mode="r"))
+
+    def load_or_build_knn(self, index, embeddings: np.ndarray, k: int) -> KnnGraph:
+        """Map the current neighbour graph, building (or incrementally updating) it if this worker wins the lock"""
+        if not self.knn_current(k):
+            with self._build_lock():
+                if not self.knn_current(k):
+                    self._build_knn(index, embeddings, k)
+                else:
+                    print(f"✅ kNN graph built by another worker in {self.directory}")
+        return self.map_knn(k)
+
+    def _build_knn(self, index, embeddings: np.ndarray, k: int):
+        start = time.perf_counter()
+        # The previous graph and the embeddings it was built from seed an incremental update
+        previous = None
+        if (self._manifest(KNN_MANIFEST_FILE)
+                and all(os.path.exists(self._path(name)) for name in (KNN_FILE, KNN_SCORES_FILE, KNN_BASE_FILE))):
+            previous = (np.load(self._path(KNN_BASE_FILE), mmap_mode="r"),
+                        KnnGraph(np.load(self._path(KNN_FILE), mmap_mode="r"),
+                                 np.load(self._path(KNN_SCORES_FILE), mmap_mode="r")))
+        graph = refresh_knn_graph(index, embeddings, k, previous)
+
+        def write_array(array):
+            def write(path):
+                with open(path, "wb") as f:
+                    np.save(f, array)
+            return write
+
+        def link_embeddings(path):
+            try:
+                os.link(self._path(EMBEDDINGS_FILE), path)
+            except OSError:
+                write_array(np.asarray(embeddings))(path)
+
+        def write_manifest(path):
+            with open(path, "w") as f:
+                json.dump({
+                    "fingerprint": self.fingerprint,
+                    "k": k,
+                    "rows": int(graph.neighbors.shape[0]),
+                    "created_at": time.time(),
+                }, f, indent=2)
+
+        self._write_atomic(KNN_FILE, write_array(graph.neighbors))
+        self._write_atomic(KNN_SCORES_FILE, write_array(graph.scores))
+        self._write_atomic(KNN_BASE_FILE, link_embeddings)
+        self._write_atomic(KNN_MANIFEST_FILE, write_manifest)
+        print(f"✅ kNN graph built in {time.perf_counter() - start:.2f}s")
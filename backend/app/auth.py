@@ -1,10 +1,21 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta, timezone
-from jose import JWTError, jwt
+from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 from dotenv import load_dotenv
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import math
 import os
+import threading
+import time
 
 load_dotenv()
 
@@ -12,9 +23,25 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-jwt-key-change-this-in-production-12345")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+# Lifetime of the per-hit tokens lazy searches hand out for /explain
+EXPLANATION_TOKEN_TTL_SECONDS = int(os.getenv("EXPLANATION_TOKEN_TTL_SECONDS", "900"))
+# Long-lived service credentials: "name:sha256hex,name2:sha256hex" (only digests are configured)
+SERVICE_API_KEYS = os.getenv("SERVICE_API_KEYS", "")
+# bcrypt runs on a dedicated bounded pool so logins never block the event loop
+LOGIN_WORKERS = int(os.getenv("LOGIN_WORKERS", "2"))
+LOGIN_MAX_PENDING = int(os.getenv("LOGIN_MAX_PENDING", "32"))
+LOGIN_RATE_LIMIT = int(os.getenv("LOGIN_RATE_LIMIT", "5"))  # attempts per user per window
+LOGIN_RATE_WINDOW_SECONDS = int(os.getenv("LOGIN_RATE_WINDOW_SECONDS", "60"))
+# Users (or service accounts) allowed on /admin endpoints; empty = nobody, since
+# the demo accounts' passwords are public
+ADMIN_USERS = {u.strip() for u in os.getenv("ADMIN_USERS", "").split(",") if u.strip()}
+# /metrics includes auth counters, so scrapers authenticate (e.g. with a service API key) unless this is set
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() in ("1", "true", "yes")
 
 # Security - Fixed bcrypt implementation
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Secure user store with proper bcrypt hashes
@@ -24,6 +51,70 @@ USERS_DB = {
     "reviewer": "$2b$12$UNstFuAza1Epla3EvC0HhuCB4vqn13tEp38EfDbC4ffPZDpzIm0lC"  # demo
 }
 
+def _load_service_keys(config: str) -> Dict[bytes, str]:
+    """Parse SERVICE_API_KEYS into a digest -> service account name map"""
+    keys = {}
+    for entry in filter(None, (e.strip() for e in config.split(","))):
+        name, _, hex_digest = entry.partition(":")
+        try:
+            keys[bytes.fromhex(hex_digest.strip())] = name.strip()
+        except ValueError:
+            print(f"❌ Ignoring malformed service API key entry for '{name}'")
+    return keys
+
+SERVICE_KEY_DIGESTS = _load_service_keys(SERVICE_API_KEYS)
+
+# Verified token -> (username, exp) so repeat callers skip the HMAC verification
+_token_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+AUTH_STATS = {
+    "token_cache_hits": 0,
+    "token_cache_misses": 0,
+    "service_key_hits": 0,
+    "verifications": 0,
+    "verify_seconds_total": 0.0,
+}
+
+def _cached_token_user(token: str) -> Optional[str]:
+    """Return the cached username for a still-valid token"""
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is None:
+            return None
+        username, exp = entry
+        if time.time() >= exp:
+            del _token_cache[token]
+            return None
+        _token_cache.move_to_end(token)
+        return username
+
+def _cache_token(token: str, username: str, exp: float):
+    with _token_cache_lock:
+        _token_cache[token] = (username, exp)
+        _token_cache.move_to_end(token)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+def _service_account(token: str) -> Optional[str]:
+    """Look up a service API key by its SHA-256 digest.
+
+    Hashing first means lookup timing depends only on the digest, never on how
+    many leading characters of the raw key matched.
+    """
+    if not SERVICE_KEY_DIGESTS:
+        return None
+    return SERVICE_KEY_DIGESTS.get(hashlib.sha256(token.encode()).digest())
+
+def get_auth_stats() -> dict:
+    """Token verification counters and mean per-request auth overhead"""
+    stats = dict(AUTH_STATS)
+    stats["token_cache_size"] = len(_token_cache)
+    stats["mean_verify_microseconds"] = (
+        stats["verify_seconds_total"] / stats["verifications"] * 1e6 if stats["verifications"] else 0.0
+    )
+    return stats
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password using bcrypt - secure implementation"""
     try:
@@ -44,6 +135,56 @@ def authenticate_user(username: str, password: str):
         return False
     return username
 
+_password_executor = ThreadPoolExecutor(max_workers=LOGIN_WORKERS, thread_name_prefix="bcrypt")
+_pending_logins = 0
+# Known username -> recent attempt times; bounded by USERS_DB, so unknown
+# names can neither grow it nor flush a real user's history out of it
+_login_attempts: Dict[str, Deque[float]] = {}
+
+def _check_login_rate(username: str) -> Optional[int]:
+    """Record a login attempt for a known user; return seconds to wait if over the limit"""
+    now = time.monotonic()
+    window_start = now - LOGIN_RATE_WINDOW_SECONDS
+    
+    attempts = _login_attempts.setdefault(username, deque())
+    while attempts and attempts[0] < window_start:
+        attempts.popleft()
+    if len(attempts) >= LOGIN_RATE_LIMIT:
+        return max(1, math.ceil(attempts[0] - window_start))
+    attempts.append(now)
+    return None
+
+async def authenticate_user_async(username: str, password: str):
+    """Rate-limited authenticate_user with bcrypt off the event loop"""
+    global _pending_logins
+    
+    # Checked first so a busy rejection does not use up the user's attempts
+    if _pending_logins >= LOGIN_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login service busy, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    
+    # Unknown users never reach bcrypt and are not tracked
+    if username not in USERS_DB:
+        return False
+    
+    retry_after = _check_login_rate(username)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+    
+    _pending_logins += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, authenticate_user, username, password)
+    finally:
+        _pending_logins -= 1
+
 def create_access_token(data: dict):
     """Create JWT token with proper timezone-aware expiration"""
     to_encode = data.copy()
@@ -52,25 +193,92 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token with proper expiration checking"""
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(SECRET_KEY.encode(), b"explain:" + payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def explanation_token_expiry() -> int:
+    """Expiry for tokens issued now; computed once per response, not per hit"""
+    return int(time.time()) + EXPLANATION_TOKEN_TTL_SECONDS
+
+def create_explanation_token(username: str, collection: Optional[str], query: str, founder_id: str,
+                             expires_at: Optional[int] = None) -> str:
+    """Signed (user, expiry, collection, query, founder id) so /explain only runs prompts
+    /search produced, for the user it produced them for, for a limited time"""
+    expires_at = expires_at if expires_at is not None else explanation_token_expiry()
+    payload = base64.urlsafe_b64encode(json.dumps([username, expires_at, collection, query, founder_id]).encode())
+    return f"{payload.rstrip(b'=').decode()}.{_sign(payload.rstrip(b'='))}"
+
+def verify_explanation_token(token: str, username: str) -> Optional[Tuple[Optional[str], str, str]]:
+    """(collection, query, founder id) from a valid, unexpired token issued to username, else None"""
+    # Genuine tokens are base64url text; anything else cannot match and would
+    # make compare_digest raise on non-ASCII str input
+    if not token.isascii():
+        return None
+    payload, _, signature = token.partition(".")
+    if not hmac.compare_digest(_sign(payload.encode()).encode(), signature.encode()):
+        return None
+    try:
+        owner, expires_at, collection, query, founder_id = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (TypeError, ValueError):
+        return None
+    if owner != username or not isinstance(expires_at, int) or expires_at <= time.time():
+        return None
+    return collection, query, founder_id
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Verify JWT token with proper expiration checking.
+
+    Runs on the event loop: a cache hit is a dict lookup, far cheaper than the
+    threadpool hop a sync dependency would cost.
+    """
+    token = credentials.credentials
+    start = time.perf_counter()
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        username = _cached_token_user(token)
+        if username is not None:
+            AUTH_STATS["token_cache_hits"] += 1
+            return username
+        
+        username = _service_account(token)
+        if username is not None:
+            AUTH_STATS["service_key_hits"] += 1
+            return username
+        
+        AUTH_STATS["token_cache_misses"] += 1
+        # jwt.decode verifies the signature and rejects expired tokens
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        # Check token expiration properly
         exp = payload.get("exp")
         if exp is None:
             raise HTTPException(status_code=401, detail="Token missing expiration")
         
-        if datetime.now(timezone.utc).timestamp() > exp:
-            raise HTTPException(status_code=401, detail="Token expired")
-            
+        _cache_token(token, username, exp)
         return username
+    except ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
     except JWTError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+    finally:
+        AUTH_STATS["verifications"] += 1
+        AUTH_STATS["verify_seconds_total"] += time.perf_counter() - start
 
-def get_current_user(token: str = Depends(verify_token)):
+async def get_current_user(token: str = Depends(verify_token)):
     return token
+
+async def get_admin_user(username: str = Depends(get_current_user)):
+    if username not in ADMIN_USERS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return username
+
+async def get_metrics_reader(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Any authenticated user or service account, or anyone when METRICS_PUBLIC is set"""
+    if METRICS_PUBLIC:
+        return None
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return await verify_token(credentials)
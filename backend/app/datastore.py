@@ -0,0 +1,176 @@
+# Founders dataset storage. CSV is parsed in full as before; Parquet and Arrow
+# IPC files load only the columns the search path needs and read the wide text
+# columns on first use. An uncompressed Arrow IPC file is memory-mapped, so
+# loading copies nothing and its pages are shared by every worker on the host.
+import argparse
+import csv
+import json
+import numpy as np
+import os
+from typing import Dict, List, Optional
+
+# Columns used to embed, rank and explain results
+SEARCH_COLUMNS = ["id", "founder_name", "role", "company", "location", "idea", "about", "keywords", "stage"]
+# Wide text columns only needed by /founder/{id} and /stats
+DETAIL_COLUMNS = ["email", "linkedin", "notes"]
+
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+def dataset_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ARROW_EXTENSIONS:
+        return "arrow"
+    if extension in PARQUET_EXTENSIONS:
+        return "parquet"
+    return "csv"
+
+
+class DatasetStore:
+    """Reads a founders dataset file, projecting columns when the format allows it"""
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.format = dataset_format(path)
+        self._table = None
+        self._detail_columns: Dict[str, object] = {}
+
+    @property
+    def columnar(self) -> bool:
+        return self.format != "csv"
+
+    def _arrow_table(self, columns: Optional[List[str]] = None):
+        """pyarrow Table of the file; memory-mapped (zero-copy) for Arrow IPC"""
+        import pyarrow as pa
+
+        if self.format == "arrow":
+            if self._table is None:
+                self._table = pa.ipc.open_file(pa.memory_map(self.path, "r")).read_all()
+            return self._table.select(columns) if columns else self._table
+
+        import pyarrow.parquet as pq
+        return pq.read_table(self.path, columns=columns, memory_map=True)
+
+    def load(self, project: bool = True):
+        """Dataframe for serving: only SEARCH_COLUMNS of a columnar file when project is set"""
+        import pandas as pd
+
+        if not self.columnar:
+            return pd.read_csv(self.path)
+
+        table = self._arrow_table()
+        if project:
+            table = table.select([c for c in SEARCH_COLUMNS if c in table.column_names])
+        # Arrow-backed columns reference the mapped buffers instead of building Python strings
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    def column(self, name: str):
+        """A column left out of the projection, read once on first use"""
+        import pandas as pd
+
+        if name not in self._detail_columns:
+            self._detail_columns[name] = self._arrow_table([name]).column(name)
+        return pd.Series(self._detail_columns[name].to_pandas(types_mapper=pd.ArrowDtype), name=name)
+
+    def row_values(self, row: int, columns: List[str]) -> dict:
+        """Selected columns of one row, without materializing whole columns as pandas"""
+        values = {}
+        for name in columns:
+            if name not in self._detail_columns:
+                self._detail_columns[name] = self._arrow_table([name]).column(name)
+            values[name] = self._detail_columns[name][row].as_py()
+        return values
+
+
+def embeddings_paths(dataset_path: str):
+    """Sidecar (vectors, manifest) paths for precomputed embeddings of a dataset file"""
+    base = os.path.splitext(dataset_path)[0]
+    return f"{base}.embeddings.npy", f"{base}.embeddings.json"
+
+
+def load_precomputed_embeddings(dataset_path: str, rows: int, model,
+                                allow_synthetic: bool = False) -> Optional[np.ndarray]:
+    """Precomputed embeddings for this dataset, if present, built from this exact file and compatible with the encoder"""
+    from .artifacts import file_sha256
+
+    vectors_path, manifest_path = embeddings_paths(dataset_path)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if manifest.get("rows") != rows or manifest.get("dimension") != model.dimension:
+        print(f"⚠️ Ignoring {vectors_path}: built for {manifest.get('rows')} rows x {manifest.get('dimension')} dims")
+        return None
+    # A regenerated dataset can keep its row count; only the content hash ties the vectors to it
+    if manifest.get("dataset_sha256") != file_sha256(dataset_path):
+        print(f"⚠️ Ignoring {vectors_path}: built for a different version of {dataset_path}")
+        return None
+    if manifest.get("source") == "model":
+        # The same model under another backend or quantization embeds differently
+        built_with = (manifest.get("model"), manifest.get("backend"), manifest.get("quantized"))
+        serving = (model.model_name, model.backend, model.quantized)
+        if built_with != serving:
+            print(f"⚠️ Ignoring {vectors_path}: built with {built_with}, serving {serving}")
+            return None
+    if manifest.get("source") == "synthetic":
+        if not allow_synthetic:
+            print(f"⚠️ Ignoring {vectors_path}: synthetic embeddings need ALLOW_SYNTHETIC_EMBEDDINGS=true")
+            return None
+        print("⚠️ Using synthetic embeddings - rankings are not semantic (capacity testing only)")
+
+    print(f"✅ Loaded precomputed embeddings from {vectors_path}")
+    return np.ascontiguousarray(np.load(vectors_path), dtype=np.float32)
+
+
+def convert(source: str, output: str, fmt: str, batch_rows: int = 100_000):
+    """Stream a CSV into Arrow IPC or Parquet without holding it all in memory"""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    with open(source, newline="") as f:
+        header = next(csv.reader(f))
+    # Every column is text; keep the schema stable regardless of what a batch happens to contain
+    convert_options = pacsv.ConvertOptions(column_types={name: pa.string() for name in header},
+                                           strings_can_be_null=True)
+    reader = pacsv.open_csv(source, read_options=pacsv.ReadOptions(block_size=1 << 24),
+                            convert_options=convert_options)
+
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    rows = 0
+    if fmt == "arrow":
+        # Uncompressed so the file can be memory-mapped without decoding
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    else:
+        with pq.ParquetWriter(tmp_path, reader.schema, compression="zstd") as writer:
+            for batch in reader:
+                writer.write_batch(batch, row_group_size=batch_rows)
+                rows += batch.num_rows
+    os.replace(tmp_path, output)
+    print(f"✅ Converted {rows} rows from {source} to {output} ({os.path.getsize(output) / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Founders dataset storage tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser("convert", help="Convert a CSV dataset to Arrow IPC or Parquet")
+    convert_parser.add_argument("source", help="Dataset CSV")
+    convert_parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    convert_parser.add_argument("--output", help="Output path (default: source with .arrow/.parquet extension)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.source)[0] + (".arrow" if args.format == "arrow" else ".parquet")
+    convert(args.source, output, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+import numpy as np
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional
+from dotenv import load_dotenv
+
+from .fileutil import exclusive_lock, write_atomic
+
+load_dotenv()
+
+# Configuration
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()  # torch | onnx
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "models/onnx")
+ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "false").lower() in ("1", "true", "yes")
+ENCODER_INTRA_OP_THREADS = int(os.getenv("ENCODER_INTRA_OP_THREADS", "0"))  # 0 = runtime default
+ENCODER_INTER_OP_THREADS = int(os.getenv("ENCODER_INTER_OP_THREADS", "0"))
+PARITY_MIN_COSINE = float(os.getenv("ONNX_PARITY_MIN_COSINE", "0.99"))
+
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE = "encoder_config.json"
+EXPORT_LOCK_FILE = ".export.lock"
+
+PARITY_SAMPLE_TEXTS = [
+    "fintech founders in London",
+    "healthtech founder in India with AI background",
+    "pre-seed climate tech startup looking for a technical co-founder",
+    "Investor specializing in SaaS and developer tools",
+    "Founder: Mark Johnson | Role: Founder | Company: Sanchez-Taylor | Stage: seed | Keywords: blockchain, SaaS, energy",
+]
+
+
+class TorchEncoder:
+    """sentence-transformers (PyTorch) encoder - the reference implementation"""
+
+    backend = "torch"
+    quantized = False
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if ENCODER_INTRA_OP_THREADS > 0:
+            torch.set_num_threads(ENCODER_INTRA_OP_THREADS)
+        if ENCODER_INTER_OP_THREADS > 0:
+            torch.set_num_interop_threads(ENCODER_INTER_OP_THREADS)
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        embeddings = self.model.encode(texts, batch_size=batch_size,
+                                       show_progress_bar=show_progress_bar, convert_to_numpy=True)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class OnnxEncoder:
+    """ONNX Runtime encoder - same model, no torch in the serving process"""
+
+    backend = "onnx"
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, quantized: bool = ONNX_QUANTIZE,
+                 config: Optional[dict] = None):
+        import json
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        if config is None:
+            with open(os.path.join(model_dir, CONFIG_FILE)) as f:
+                config = json.load(f)
+        self.config = config
+
+        self.model_name = self.config["model_name"]
+        self.dimension = self.config["dimension"]
+        self.pooling = self.config["pooling"]
+        self.normalize = self.config["normalize"]
+        self.quantized = quantized
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ENCODER_INTRA_OP_THREADS > 0:
+            options.intra_op_num_threads = ENCODER_INTRA_OP_THREADS
+        if ENCODER_INTER_OP_THREADS > 0:
+            options.inter_op_num_threads = ENCODER_INTER_OP_THREADS
+
+        model_file = ONNX_INT8_FILE if quantized else ONNX_FP32_FILE
+        self.session = ort.InferenceSession(os.path.join(model_dir, model_file), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encoded], dtype=np.int64)
+
+            hidden = self.session.run(None, feeds)[0]
+            batches.append(self._pool(hidden, attention_mask))
+
+            done = min(start + batch_size, len(texts))
+            if show_progress_bar and (len(batches) % 10 == 0 or done == len(texts)):
+                print(f"🔄 Encoded {done}/{len(texts)} texts")
+
+        if not batches:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack(batches)
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Apply the sentence-transformers pooling/normalize modules in numpy"""
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        pooled = pooled.astype(np.float32)
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+
+def onnx_artifacts_exist(model_dir: str = ONNX_MODEL_DIR, quantized: bool = ONNX_QUANTIZE,
+                         model_name: str = EMBEDDING_MODEL) -> bool:
+    """True when a finished export of model_name (in the requested precision) is in model_dir"""
+    import json
+
+    model_file = ONNX_INT8_FILE if quantized else ONNX_FP32_FILE
+    if not all(os.path.exists(os.path.join(model_dir, name)) for name in (model_file, TOKENIZER_FILE)):
+        return False
+    try:
+        with open(os.path.join(model_dir, CONFIG_FILE)) as f:
+            exported = json.load(f).get("model_name")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    if exported != model_name:
+        print(f"⚠️ ONNX export in {model_dir} is {exported}, EMBEDDING_MODEL is {model_name}")
+        return False
+    return True
+
+
+def _parity_cosines(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Per-text cosine between reference and candidate embeddings (normalizes both in place)"""
+    reference /= np.clip(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12, None)
+    candidate /= np.clip(np.linalg.norm(candidate, axis=1, keepdims=True), 1e-12, None)
+    return (reference * candidate).sum(axis=1)
+
+
+def export_onnx(model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR, quantize: bool = ONNX_QUANTIZE):
+    """Export the sentence-transformers model to ONNX (and optionally int8).
+
+    Every file is written atomically and encoder_config.json goes last, so
+    onnx_artifacts_exist only sees a finished export. The exported models are
+    checked against the torch model first; a failed check raises before the
+    config is written, so a broken export is never served.
+    """
+    import inspect
+    import json
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(model_dir, exist_ok=True)
+    # Un-mark any previous export first; its model files are replaced below, and a
+    # stale int8 model (of another model) must not outlive an fp32-only re-export
+    for stale in [CONFIG_FILE] + ([] if quantize else [ONNX_INT8_FILE]):
+        if os.path.exists(os.path.join(model_dir, stale)):
+            os.remove(os.path.join(model_dir, stale))
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+
+    pooling_mode = "mean"
+    normalize = False
+    for module in list(st)[1:]:
+        name = type(module).__name__
+        if name == "Pooling":
+            pooling_mode = getattr(module, "pooling_mode", None) or module.get_pooling_mode_str()
+        elif name == "Normalize":
+            normalize = True
+    if pooling_mode not in ("mean", "cls"):
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling_mode}")
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask,
+                              token_type_ids=token_type_ids).last_hidden_state
+
+    dummy = tokenizer(["founder matching query"], return_tensors="pt", padding=True)
+    token_type_ids = dummy.get("token_type_ids", torch.zeros_like(dummy["input_ids"]))
+    fp32_path = os.path.join(model_dir, ONNX_FP32_FILE)
+    # torch 2.5+ defaults new exporters to dynamo; older releases lack the argument
+    export_options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+    def write_fp32(path):
+        with torch.no_grad():
+            torch.onnx.export(
+                _Wrapper(transformer),
+                (dummy["input_ids"], dummy["attention_mask"], token_type_ids),
+                path,
+                input_names=["input_ids", "attention_mask", "token_type_ids"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "token_type_ids": {0: "batch", 1: "sequence"},
+                    "last_hidden_state": {0: "batch", 1: "sequence"},
+                },
+                opset_version=17,
+                do_constant_folding=True,
+                **export_options,
+            )
+
+    config = {
+        "model_name": model_name,
+        "dimension": st.get_sentence_embedding_dimension(),
+        "max_seq_length": st.max_seq_length,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+        "pooling": pooling_mode,
+        "normalize": normalize,
+    }
+
+    def write_config(path):
+        with open(path, "w") as f:
+            json.dump(config, f, indent=2)
+
+    def check_export(quantized: bool):
+        candidate = OnnxEncoder(model_dir, quantized, config=config).encode(PARITY_SAMPLE_TEXTS)
+        reference = np.asarray(st.encode(PARITY_SAMPLE_TEXTS, convert_to_numpy=True), dtype=np.float32)
+        min_cosine = float(_parity_cosines(reference, candidate).min())
+        label = "int8" if quantized else "fp32"
+        if min_cosine < PARITY_MIN_COSINE:
+            raise RuntimeError(f"ONNX {label} export failed parity: min cosine {min_cosine:.4f} "
+                               f"< {PARITY_MIN_COSINE} against {model_name}")
+        print(f"✅ ONNX {label} parity: min cosine {min_cosine:.4f}")
+
+    print(f"🔄 Exporting {model_name} to {fp32_path}...")
+    write_atomic(model_dir, ONNX_FP32_FILE, write_fp32)
+    write_atomic(model_dir, TOKENIZER_FILE, tokenizer.backend_tokenizer.save)
+    check_export(quantized=False)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = os.path.join(model_dir, ONNX_INT8_FILE)
+        print(f"🔄 Quantizing to {int8_path}...")
+        write_atomic(model_dir, ONNX_INT8_FILE,
+                     lambda path: quantize_dynamic(fp32_path, path, weight_type=QuantType.QInt8))
+        check_export(quantized=True)
+
+    # The config is written last: it is what marks the export as complete
+    write_atomic(model_dir, CONFIG_FILE, write_config)
+    print(f"✅ ONNX encoder exported to {model_dir}")
+
+
+def _export_in_subprocess(model_dir: str, quantize: bool):
+    """Run the export in a child process so torch never loads into the server"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "app.encoders", "export", "--model-dir", os.path.abspath(model_dir)]
+    if quantize:
+        command.append("--quantize")
+    subprocess.run(command, cwd=backend_dir, check=True)
+
+
+def load_encoder(backend: str = EMBEDDING_BACKEND, quantized: bool = ONNX_QUANTIZE):
+    """Load the configured query/document encoder (quantized selects the int8 ONNX model)"""
+    if backend == "onnx":
+        if not onnx_artifacts_exist(ONNX_MODEL_DIR, quantized):
+            with exclusive_lock(os.path.join(ONNX_MODEL_DIR, EXPORT_LOCK_FILE)):
+                # Another worker may have finished the export while we waited
+                if not onnx_artifacts_exist(ONNX_MODEL_DIR, quantized):
+                    print(f"🔄 ONNX encoder not found in {ONNX_MODEL_DIR}, exporting once...")
+                    _export_in_subprocess(ONNX_MODEL_DIR, quantized)
+                else:
+                    print(f"✅ ONNX encoder exported by another worker in {ONNX_MODEL_DIR}")
+        encoder = OnnxEncoder(ONNX_MODEL_DIR, quantized)
+        print(f"✅ ONNX encoder loaded ({'int8' if quantized else 'fp32'})")
+        return encoder
+
+    if backend != "torch":
+        print(f"❌ Unknown EMBEDDING_BACKEND '{backend}', falling back to torch")
+    return TorchEncoder(EMBEDDING_MODEL)
+
+
+_shared_encoder = None
+_shared_encoder_lock = threading.Lock()
+
+
+def get_shared_encoder():
+    """Process-wide encoder, so every dataset collection reuses one copy of the weights"""
+    global _shared_encoder
+    with _shared_encoder_lock:
+        if _shared_encoder is None:
+            _shared_encoder = load_encoder()
+        return _shared_encoder
+
+
+def _per_query_latency_ms(encoder, texts: List[str], rounds: int = 5) -> float:
+    encoder.encode(texts[:1])  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            encoder.encode([text])
+    return (time.perf_counter() - start) * 1000 / (rounds * len(texts))
+
+
+def check_parity(texts: Optional[List[str]] = None, model_dir: str = ONNX_MODEL_DIR,
+                 quantized: bool = ONNX_QUANTIZE, min_cosine: float = PARITY_MIN_COSINE) -> dict:
+    """Compare ONNX embeddings, latency and memory against the torch reference encoder.
+
+    RSS growth is measured per encoder after it has encoded the sample, ONNX
+    first, so the torch figure includes importing torch - the memory an ONNX
+    deployment never pays.
+    """
+    from .profiler import rss_mb
+
+    texts = texts or PARITY_SAMPLE_TEXTS
+    rss_before = rss_mb()
+    onnx_encoder = OnnxEncoder(model_dir, quantized)
+    candidate = onnx_encoder.encode(texts)
+    onnx_rss_mb = rss_mb() - rss_before
+
+    rss_before = rss_mb()
+    torch_encoder = TorchEncoder(onnx_encoder.model_name)
+    reference = torch_encoder.encode(texts)
+    torch_rss_mb = rss_mb() - rss_before
+
+    cosines = _parity_cosines(reference, candidate)
+
+    return {
+        "model_name": onnx_encoder.model_name,
+        "quantized": quantized,
+        "num_texts": len(texts),
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "max_abs_diff": float(np.abs(reference - candidate).max()),
+        "torch_ms_per_query": _per_query_latency_ms(torch_encoder, texts),
+        "onnx_ms_per_query": _per_query_latency_ms(onnx_encoder, texts),
+        "torch_rss_mb": round(torch_rss_mb, 1),
+        "onnx_rss_mb": round(onnx_rss_mb, 1),
+        "passed": bool(cosines.min() >= min_cosine),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="ONNX query encoder tooling")
+    parser.add_argument("command", choices=["export", "check-parity"])
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--model-dir", default=ONNX_MODEL_DIR)
+    parser.add_argument("--quantize", action="store_true", default=ONNX_QUANTIZE)
+    parser.add_argument("--min-cosine", type=float, default=PARITY_MIN_COSINE)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.model, args.model_dir, args.quantize)
+    else:
+        report = check_parity(model_dir=args.model_dir, quantized=args.quantize, min_cosine=args.min_cosine)
+        print(json.dumps(report, indent=2))
+        sys.exit(0 if report["passed"] else 1)
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Tuple
+from dotenv import load_dotenv
+import os
+import threading
+import time
+
+from .metrics import CACHE_EVENTS
+
+load_dotenv()
+
+# Configuration
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "4096"))
+EXPLANATION_CACHE_TTL_SECONDS = float(os.getenv("EXPLANATION_CACHE_TTL_SECONDS", "3600"))
+
+
+class ExplanationCache:
+    """Bounded LRU of match explanations keyed by (dataset version, query, founder id).
+
+    Concurrent requests for a key that is still being generated wait for
+    the in-flight call instead of issuing their own, so every explanation is
+    produced at most once per TTL. A cache built with max_entries=0, or with
+    enabled turned off (benchmarks), computes every call.
+    """
+
+    def __init__(self, max_entries: int = EXPLANATION_CACHE_SIZE, ttl: float = EXPLANATION_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = max_entries > 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Tuple[str, bool]]) -> str:
+        """Cached text for key, else compute() -> (text, cacheable) once for all concurrent callers"""
+        if not self.enabled:
+            return compute()[0]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                CACHE_EVENTS.labels("explanation", "hit").inc()
+                return entry[1]
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                future = self._inflight[key] = Future()
+
+        if inflight is not None:
+            CACHE_EVENTS.labels("explanation", "coalesced").inc()
+            return inflight.result()
+
+        CACHE_EVENTS.labels("explanation", "miss").inc()
+        try:
+            text, cacheable = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if cacheable:
+                self._entries[key] = (time.monotonic() + self.ttl, text)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(text)
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Global explanation cache shared by /search, /search/page and /explain
+explanation_cache = ExplanationCache()
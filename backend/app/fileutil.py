@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+from typing import Callable
+import fcntl
+import os
+
+
+@contextmanager
+def exclusive_lock(path: str):
+    """Cross-process lock on a lock file, so only one worker builds or exports at a time"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_atomic(directory: str, name: str, write: Callable[[str], None]):
+    """Write to a private temp file and rename it into place, so readers never see a partial file"""
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, os.path.join(directory, name))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
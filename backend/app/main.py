@@ -1,37 +1,42 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from typing import List, Optional
+import asyncio
+import json
+import os
+import time
 import uvicorn
 
 from .models import *
-from .auth import get_current_user, authenticate_user, create_access_token
-from .rag import rag_service
+from .auth import (
+    get_current_user, get_admin_user, get_metrics_reader, authenticate_user_async, create_access_token,
+    get_auth_stats, create_explanation_token, explanation_token_expiry, verify_explanation_token,
+)
+from .metrics import REQUEST_SECONDS, begin_request_spans, register_service_collector, render_metrics, server_timing_header, span
+from .profiler import PROFILE_MAX_SECONDS, ProfileInProgress, capture_profile
+from .rag import RAGService, rag_service
+from .serialization import JSONBytesResponse, encode_search_page
+from .snapshots import SEARCH_SNAPSHOT_DEPTH, SearchSnapshot, SnapshotExpired, decode_cursor, encode_cursor, snapshot_store
+from .registry import CollectionLoadError, CollectionNotFound, begin_request_leases, collection_registry
 from .validation import validate_search_query, validate_limit
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup - the RAG system loads in a worker thread so the server binds
+    # immediately; /health reports per-phase progress until it is ready.
     print("🚀 Starting Founder RAG Chat API with Gemini...")
-    
-    print("📊 Loading dataset...")
-    if not rag_service.load_dataset():
-        print("❌ Failed to load dataset")
-        yield
-        return
-    
-    print("🧠 Initializing RAG system...")
-    if not rag_service.initialize_embeddings():
-        print("❌ Failed to initialize RAG system")
-        yield
-        return
-    
-    print("✅ API ready! Visit /docs for documentation")
+    startup_task = asyncio.create_task(asyncio.to_thread(rag_service.startup))
+    print("✅ API accepting connections! Visit /docs for documentation")
     
     yield
     
     # Shutdown
     print("🛑 Shutting down...")
+    if not startup_task.done():
+        print("⏳ Waiting for RAG startup to finish...")
+        await startup_task
+    collection_registry.close()
 
 # Initialize FastAPI
 app = FastAPI(
@@ -61,6 +66,72 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+LOG_REQUEST_SPANS = os.getenv("LOG_REQUEST_SPANS", "false").lower() in ("1", "true", "yes")
+# Retry-After sent with 503s while startup is still loading
+STARTUP_RETRY_AFTER_SECONDS = os.getenv("STARTUP_RETRY_AFTER_SECONDS", "5")
+
+register_service_collector(
+    index_size=lambda: rag_service.index.ntotal if rag_service.index is not None else 0,
+    auth_stats=get_auth_stats,
+)
+
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """Per-request stage spans -> Server-Timing header, latency histogram and optional JSON log.
+
+    Also releases the collection leases the request took, so an evicted
+    collection is closed only after its in-flight requests are done.
+    """
+    spans = begin_request_spans()
+    leases = begin_request_leases()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        for service in leases:
+            collection_registry.release(service)
+    elapsed = time.perf_counter() - start
+    
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    REQUEST_SECONDS.labels(request.method, route_path, str(response.status_code)).observe(elapsed)
+    response.headers["Server-Timing"] = server_timing_header(spans, elapsed)
+    
+    if LOG_REQUEST_SPANS and spans:
+        print(json.dumps({
+            "event": "request_spans",
+            "method": request.method,
+            "route": route_path,
+            "status": response.status_code,
+            "total_ms": round(elapsed * 1000, 3),
+            "spans": [{"stage": stage, "ms": round(seconds * 1000, 3)} for stage, seconds in spans],
+        }))
+    return response
+
+async def get_collection(name: Optional[str], require_ready: bool = True) -> RAGService:
+    """Resolve a collection name to a ready RAGService, loading cold collections off the event loop"""
+    try:
+        # A leased collection stays open until this request completes, even if it is evicted meanwhile
+        service = collection_registry.lease(name, load=False) or await asyncio.to_thread(collection_registry.lease, name)
+    except CollectionNotFound:
+        raise HTTPException(status_code=404, detail=f"Collection '{name}' not found")
+    except CollectionLoadError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    if require_ready and not service.is_ready():
+        raise HTTPException(status_code=503, detail="RAG system not ready",
+                            headers={"Retry-After": STARTUP_RETRY_AFTER_SECONDS})
+    if not service.is_dataset_loaded():
+        raise HTTPException(status_code=503, detail="Dataset not loaded yet",
+                            headers={"Retry-After": STARTUP_RETRY_AFTER_SECONDS})
+    return service
+
+def attach_explanation_tokens(results: List[dict], username: str, collection: Optional[str], query: str):
+    """Lazy mode: each hit carries a signed, per-user, expiring token that /explain turns into the full explanation"""
+    expires_at = explanation_token_expiry()
+    for result in results:
+        result["explanation_token"] = create_explanation_token(username, collection, query, result["id"], expires_at)
+
 # Health check endpoint
 @app.get("/", tags=["Health"])
 async def root():
@@ -73,13 +144,24 @@ async def root():
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     return HealthResponse(
-        status="healthy",
+        status="healthy" if rag_service.is_ready() else ("unhealthy" if rag_service.startup_status == "failed" else "starting"),
+        startup_status=rag_service.startup_status,
+        startup_phases=rag_service.startup_phases,
         dataset_loaded=rag_service.founders_df is not None,
         rag_initialized=rag_service.is_ready(),
         total_founders=len(rag_service.founders_df) if rag_service.founders_df is not None else 0,
         gemini_available=rag_service.is_gemini_available()
     )
 
+@app.get("/collections", response_model=List[CollectionStatus], tags=["Health"])
+async def list_collections():
+    return [CollectionStatus(**c) for c in collection_registry.status()]
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics(reader: Optional[str] = Depends(get_metrics_reader)):
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 # Authentication endpoints
 @app.post("/auth/login", response_model=Token, tags=["Authentication"])
 async def login(user_data: UserLogin):
@@ -87,7 +169,7 @@ async def login(user_data: UserLogin):
     if not user_data.username or not user_data.password:
         raise HTTPException(status_code=400, detail="Username and password required")
     
-    username = authenticate_user(user_data.username.lower().strip(), user_data.password)
+    username = await authenticate_user_async(user_data.username.lower().strip(), user_data.password)
     if not username:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -105,57 +187,156 @@ async def search_founders(
     current_user: str = Depends(get_current_user)
 ):
     # Validate query
-    validated_query = validate_search_query(query.query)
-    validated_limit = validate_limit(query.limit)
+    with span("validation"):
+        validated_query = validate_search_query(query.query)
+        validated_limit = validate_limit(query.limit)
     
-    if not rag_service.is_ready():
-        raise HTTPException(status_code=503, detail="RAG system not ready")
+    service = await get_collection(query.collection)
+    # The semantic cache may answer with an equivalent earlier query's ranking and wording
+    ranked_query, scores, indices = service.rank(validated_query, validated_limit)
+    lazy = query.explain == "lazy"
+    results = service.materialize_results(validated_query, scores, indices, lazy=lazy, explain_query=ranked_query)
+    if lazy:
+        attach_explanation_tokens(results, current_user, query.collection, ranked_query)
     
-    results = rag_service.search_founders(validated_query, validated_limit)
+    # Results are already schema-shaped; skip per-field validation and serialize in one pass
+    return JSONBytesResponse(content=service.encode_results(results))
+
+@app.post("/search/page", response_model=SearchPage, tags=["Search"])
+async def search_page(
+    request: SearchPageRequest,
+    current_user: str = Depends(get_current_user)
+):
+    """Cursor pagination: the first call ranks up to SEARCH_SNAPSHOT_DEPTH candidates once,
+    later calls page through that snapshot without re-encoding or re-searching"""
+    with span("validation"):
+        validated_limit = validate_limit(request.limit)
     
-    founder_results = []
-    for result in results:
-        founder_results.append(FounderResult(**result))
+    if request.cursor:
+        try:
+            snapshot_id, offset = decode_cursor(request.cursor)
+            snapshot = snapshot_store.get(snapshot_id, current_user)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        except SnapshotExpired:
+            raise HTTPException(status_code=410, detail="Cursor expired, run the search again")
+        service = await get_collection(snapshot.collection)
+        if service.dataset_version != snapshot.dataset_version:
+            # The collection was reloaded from a changed dataset since the search ran
+            raise HTTPException(status_code=410, detail="Cursor expired, run the search again")
+    else:
+        with span("validation"):
+            validated_query = validate_search_query(request.query)
+        service = await get_collection(request.collection)
+        ranked_query, scores, indices = service.rank(validated_query, SEARCH_SNAPSHOT_DEPTH)
+        snapshot = SearchSnapshot(current_user, validated_query, request.collection, indices, scores, ranked_query,
+                                  service.dataset_version)
+        snapshot_id, offset = snapshot_store.put(snapshot), 0
+    
+    # Explanations are generated for this page only
+    scores, rows = snapshot.page(offset, validated_limit)
+    lazy = request.explain == "lazy"
+    results = service.materialize_results(snapshot.query, scores, rows, lazy=lazy, explain_query=snapshot.ranked_query)
+    if lazy:
+        attach_explanation_tokens(results, current_user, snapshot.collection, snapshot.ranked_query)
+    next_offset = offset + len(rows)
+    
+    next_cursor = encode_cursor(snapshot_id, next_offset) if next_offset < len(snapshot) else None
+    return JSONBytesResponse(content=encode_search_page(service.encode_results(results), next_cursor, len(snapshot)))
+
+@app.post("/explain", response_model=ExplainResponse, tags=["Search"])
+async def explain_match(
+    request: ExplainRequest,
+    current_user: str = Depends(get_current_user)
+):
+    """Explanation for one hit of a lazy search, shared with the /search explanation cache"""
+    payload = verify_explanation_token(request.token, current_user)
+    if payload is None:
+        raise HTTPException(status_code=400, detail="Invalid or expired explanation token")
+    collection, query, founder_id = payload
+    
+    service = await get_collection(collection)
+    with span("explanation"):
+        # Gemini is a network call; keep it off the event loop
+        snippet = await asyncio.to_thread(service.explain_founder, query, founder_id)
+    if snippet is None:
+        raise HTTPException(status_code=404, detail="Founder not found")
     
-    return founder_results
+    return ExplainResponse(founder_id=founder_id, snippet=snippet)
 
 @app.get("/founder/{founder_id}", response_model=FounderDetails, tags=["Founders"])
 async def get_founder_details(
     founder_id: str, 
+    collection: Optional[str] = None,
     current_user: str = Depends(get_current_user)
 ):
     # Basic validation
     if not founder_id or not founder_id.strip():
         raise HTTPException(status_code=400, detail="Founder ID required")
     
-    founder_data = rag_service.get_founder_by_id(founder_id.strip())
+    service = await get_collection(collection, require_ready=False)
+    founder_data = service.get_founder_by_id(founder_id.strip())
     
     if founder_data is None:
         raise HTTPException(status_code=404, detail="Founder not found")
     
     return FounderDetails(**founder_data)
 
+@app.get("/founder/{founder_id}/similar", response_model=List[SimilarFounder], tags=["Founders"])
+async def get_similar_founders(
+    founder_id: str,
+    limit: int = 5,
+    collection: Optional[str] = None,
+    current_user: str = Depends(get_current_user)
+):
+    """Founders most like this one, read from the precomputed neighbour graph (no query encoding)"""
+    if not founder_id or not founder_id.strip():
+        raise HTTPException(status_code=400, detail="Founder ID required")
+    
+    service = await get_collection(collection)
+    similar = service.similar_founders(founder_id.strip(), validate_limit(limit))
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Founder not found")
+    
+    rows, scores = similar
+    return JSONBytesResponse(content=service.encode_similar(rows, scores))
+
 @app.get("/stats", tags=["Analytics"])
-async def get_statistics(current_user: str = Depends(get_current_user)):
-    return rag_service.get_stats()
+async def get_statistics(collection: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    service = await get_collection(collection, require_ready=False)
+    return service.get_stats()
 
 # Demo endpoint for testing without auth
 @app.post("/demo/search", response_model=List[FounderResult], tags=["Demo"])
 async def demo_search(query: SearchQuery):
     """Demo endpoint for testing - no auth required"""
-    validated_query = validate_search_query(query.query)
+    with span("validation"):
+        validated_query = validate_search_query(query.query)
     
     if not rag_service.is_ready():
-        raise HTTPException(status_code=503, detail="RAG system not ready")
+        raise HTTPException(status_code=503, detail="RAG system not ready",
+                            headers={"Retry-After": STARTUP_RETRY_AFTER_SECONDS})
     
     # Limit demo results to 3
     results = rag_service.search_founders(validated_query, min(query.limit or 3, 3))
     
-    founder_results = []
-    for result in results:
-        founder_results.append(FounderResult(**result))
-    
-    return founder_results
+    return JSONBytesResponse(content=rag_service.encode_results(results))
+
+# Admin endpoints
+@app.get("/admin/profile", tags=["Admin"], response_class=Response)
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(10.0, ge=1),
+    include_idle: bool = False,
+    current_user: str = Depends(get_admin_user)
+):
+    """Sample all threads (event loop and executors) and return folded stacks for flamegraphs"""
+    try:
+        # The sampler sleeps between samples in its own thread, so the loop keeps serving
+        folded = await asyncio.to_thread(capture_profile, seconds, interval_ms, include_idle)
+    except ProfileInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return Response(content=folded, media_type="text/plain")
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
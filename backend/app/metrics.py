@@ -0,0 +1,115 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from typing import Callable, List, Optional, Tuple
+import os
+import time
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds", "Latency of each search pipeline stage", ["stage"], buckets=LATENCY_BUCKETS,
+)
+EXPLANATION_SECONDS = Histogram(
+    "rag_explanation_seconds", "Latency of a single match explanation", ["source"], buckets=LATENCY_BUCKETS,
+)
+CACHE_EVENTS = Counter("rag_cache_events_total", "Cache lookups by cache and result", ["cache", "result"])
+EXPLANATION_FALLBACKS = Counter(
+    "rag_explanation_fallbacks_total", "Explanations served by the rule-based fallback", ["reason"],
+)
+GEMINI_ERRORS = Counter("rag_gemini_errors_total", "Gemini explanation calls that raised")
+
+# Spans recorded during the current request, for the Server-Timing header
+_request_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_spans", default=None)
+
+
+@contextmanager
+def span(stage: str):
+    """Time a pipeline stage into the stage histogram and the current request's spans"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def begin_request_spans() -> List[Tuple[str, float]]:
+    """Start collecting spans for the current request; returns the (mutable) span list"""
+    spans: List[Tuple[str, float]] = []
+    _request_spans.set(spans)
+    return spans
+
+
+def server_timing_header(spans: List[Tuple[str, float]], total: float) -> str:
+    """Server-Timing value with repeated stages (e.g. per-call explanations) summed"""
+    totals, counts = {}, {}
+    for stage, elapsed in spans:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+        counts[stage] = counts.get(stage, 0) + 1
+
+    parts = []
+    for stage, elapsed in totals.items():
+        part = f"{stage};dur={elapsed * 1000:.2f}"
+        if counts[stage] > 1:
+            part += f';desc="{counts[stage]} calls"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class _ServiceCollector:
+    """Scrape-time metrics read from service state, so hot paths stay untouched"""
+
+    def __init__(self, index_size: Callable[[], int], auth_stats: Callable[[], dict]):
+        self.index_size = index_size
+        self.auth_stats = auth_stats
+
+    def collect(self):
+        yield GaugeMetricFamily("rag_index_vectors", "Vectors in the FAISS index", value=self.index_size())
+
+        stats = self.auth_stats()
+        token_cache = CounterMetricFamily("rag_token_cache_lookups", "JWT verification cache lookups",
+                                          labels=["result"])
+        token_cache.add_metric(["hit"], stats["token_cache_hits"])
+        token_cache.add_metric(["miss"], stats["token_cache_misses"])
+        token_cache.add_metric(["service_key"], stats["service_key_hits"])
+        yield token_cache
+        yield CounterMetricFamily("rag_auth_verify_seconds", "Total time spent verifying credentials",
+                                  value=stats["verify_seconds_total"])
+
+
+_service_collector: Optional[_ServiceCollector] = None
+
+
+def register_service_collector(index_size: Callable[[], int], auth_stats: Callable[[], dict]):
+    global _service_collector
+    _service_collector = _ServiceCollector(index_size, auth_stats)
+    REGISTRY.register(_service_collector)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus text exposition, aggregated across workers in multiprocess mode.
+
+    The service collector reads in-process state, so in multiprocess mode its
+    series come from whichever worker answered the scrape.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        if _service_collector is not None:
+            registry.register(_service_collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 class UserLogin(BaseModel):
     username: str
@@ -12,6 +12,16 @@ class Token(BaseModel):
 class SearchQuery(BaseModel):
     query: str
     limit: Optional[int] = 5
+    collection: Optional[str] = None
+    # "lazy" returns rule-based snippets plus explanation tokens for /explain
+    explain: Literal["eager", "lazy"] = "eager"
+
+class SearchPageRequest(BaseModel):
+    query: Optional[str] = None
+    limit: Optional[int] = 5
+    collection: Optional[str] = None
+    cursor: Optional[str] = None
+    explain: Literal["eager", "lazy"] = "eager"
 
 class FounderResult(BaseModel):
     id: str
@@ -23,7 +33,22 @@ class FounderResult(BaseModel):
     similarity_score: float
     matched_fields: List[str]
     row_id: int
+    explanation_token: Optional[str] = None
     
+class SimilarFounder(BaseModel):
+    id: str
+    founder_name: str
+    role: str
+    company: str
+    location: str
+    similarity_score: float
+    row_id: int
+
+class SearchPage(BaseModel):
+    results: List[FounderResult]
+    next_cursor: Optional[str] = None
+    total_candidates: int
+
 class FounderDetails(BaseModel):
     id: str
     founder_name: str
@@ -38,9 +63,30 @@ class FounderDetails(BaseModel):
     linkedin: str
     notes: Optional[str] = None
 
+class StartupPhase(BaseModel):
+    status: str
+    seconds: Optional[float] = None
+
 class HealthResponse(BaseModel):
     status: str
+    startup_status: str
+    startup_phases: Dict[str, StartupPhase]
     dataset_loaded: bool
     rag_initialized: bool
     total_founders: int
     gemini_available: bool
+
+class CollectionStatus(BaseModel):
+    name: str
+    resident: bool
+    ready: bool
+    total_founders: int
+    memory_mb: float
+    last_used: Optional[float] = None
+
+class ExplainRequest(BaseModel):
+    token: str
+
+class ExplainResponse(BaseModel):
+    founder_id: str
+    snippet: str
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+import numpy as np
+import os
+import threading
+
+load_dotenv()
+
+# Configuration - neighbours stored per founder; 0 disables the graph and
+# /founder/{id}/similar searches the index with the stored embedding instead
+SIMILAR_FOUNDERS_K = int(os.getenv("SIMILAR_FOUNDERS_K", "10"))
+# Rows per index.search call while building the graph, and batches searched at once.
+# Each batch search already runs on FAISS's OpenMP threads, so one batch at a
+# time leaves the most headroom for foreground /search calls.
+KNN_BATCH_SIZE = int(os.getenv("KNN_BATCH_SIZE", "1024"))
+KNN_BUILD_THREADS = int(os.getenv("KNN_BUILD_THREADS", "1"))
+
+# Embeddings closer than this are treated as unchanged between builds
+CHANGE_TOLERANCE = 1e-5
+# Above this share of changed rows an incremental update costs more than a rebuild
+MAX_INCREMENTAL_FRACTION = 0.25
+
+# One graph build per process at a time, whichever collection it belongs to
+_build_lock = threading.Lock()
+
+
+class KnnGraph:
+    """Top-k most similar rows of every row: int32 row numbers + float32 scores, best first"""
+
+    __slots__ = ("neighbors", "scores")
+
+    def __init__(self, neighbors: np.ndarray, scores: np.ndarray):
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.neighbors.nbytes + self.scores.nbytes
+
+    def lookup(self, row: int, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        rows, scores = self.neighbors[row, :limit], self.scores[row, :limit]
+        valid = rows >= 0
+        return rows[valid], scores[valid]
+
+
+def _drop_self(scores: np.ndarray, indices: np.ndarray, rows: np.ndarray, k: int):
+    """First k hits of each row that are not the row itself"""
+    # A stable sort moves the self-hit (if any) to the end and keeps the rest in rank order
+    order = np.argsort(indices == rows[:, None], axis=1, kind="stable")[:, :k]
+    return (np.take_along_axis(indices, order, axis=1).astype(np.int32),
+            np.take_along_axis(scores, order, axis=1).astype(np.float32))
+
+
+def _search_rows(index, embeddings: np.ndarray, rows: np.ndarray, k: int,
+                 neighbors: np.ndarray, scores: np.ndarray, batch_size: int, threads: int):
+    """Fill neighbors/scores for the given rows with batched index searches, threads batches at a time.
+
+    Never touches the process-wide OpenMP settings: the build runs next to
+    foreground searches that share them.
+    """
+    def search_batch(batch: np.ndarray):
+        found_scores, found_rows = index.search(np.ascontiguousarray(embeddings[batch], dtype=np.float32), k + 1)
+        neighbors[batch], scores[batch] = _drop_self(found_scores, found_rows, batch, k)
+
+    batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+    if threads <= 1 or len(batches) <= 1:
+        for batch in batches:
+            search_batch(batch)
+        return
+
+    # FAISS releases the GIL, so batches run side by side on the build's own pool
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="knn-build") as pool:
+        list(pool.map(search_batch, batches))
+
+
+def build_knn_graph(index, embeddings: np.ndarray, k: int = SIMILAR_FOUNDERS_K,
+                    batch_size: int = KNN_BATCH_SIZE, threads: int = KNN_BUILD_THREADS) -> KnnGraph:
+    """Neighbours of every row, found by searching the serving index with the stored embeddings"""
+    rows = len(embeddings)
+    neighbors = np.full((rows, k), -1, dtype=np.int32)
+    scores = np.full((rows, k), -np.inf, dtype=np.float32)
+    _search_rows(index, embeddings, np.arange(rows), k, neighbors, scores, batch_size, threads)
+    return KnnGraph(neighbors, scores)
+
+
+def changed_rows(previous: np.ndarray, embeddings: np.ndarray) -> Optional[np.ndarray]:
+    """Rows whose embedding differs from the previous build (appended rows included),
+    or None when rows were removed and row numbers no longer line up"""
+    if len(previous) > len(embeddings) or previous.shape[1] != embeddings.shape[1]:
+        return None
+    common = len(previous)
+    differs = np.zeros(len(embeddings), dtype=bool)
+    differs[common:] = True
+    for start in range(0, common, KNN_BATCH_SIZE):
+        stop = min(start + KNN_BATCH_SIZE, common)
+        differs[start:stop] = np.abs(previous[start:stop] - embeddings[start:stop]).max(axis=1) > CHANGE_TOLERANCE
+    return np.flatnonzero(differs)
+
+
+def update_knn_graph(graph: KnnGraph, index, embeddings: np.ndarray, changed: np.ndarray,
+                     batch_size: int = KNN_BATCH_SIZE, threads: int = KNN_BUILD_THREADS) -> KnnGraph:
+    """Refresh a graph after the given rows changed or were appended.
+
+    Changed rows, and rows that listed a changed row as a neighbour, are
+    searched again. Every other row only compares itself against the
+    changed rows, which may now belong in its top k.
+    """
+    rows, k = len(embeddings), graph.k
+    neighbors = np.full((rows, k), -1, dtype=np.int32)
+    scores = np.full((rows, k), -np.inf, dtype=np.float32)
+    previous_rows = len(graph.neighbors)
+    neighbors[:previous_rows] = graph.neighbors
+    scores[:previous_rows] = graph.scores
+
+    stale = np.isin(neighbors, changed).any(axis=1)
+    stale[changed] = True
+    _search_rows(index, embeddings, np.flatnonzero(stale), k, neighbors, scores, batch_size, threads)
+
+    candidates = np.ascontiguousarray(embeddings[changed], dtype=np.float32)
+    fresh = np.flatnonzero(~stale)
+    for start in range(0, len(fresh), batch_size):
+        batch = fresh[start:start + batch_size]
+        similarity = np.asarray(embeddings[batch], dtype=np.float32) @ candidates.T
+        merged_scores = np.concatenate([scores[batch], similarity], axis=1)
+        merged_rows = np.concatenate([neighbors[batch], np.broadcast_to(changed.astype(np.int32), similarity.shape)], axis=1)
+        best = np.argsort(-merged_scores, axis=1, kind="stable")[:, :k]
+        neighbors[batch] = np.take_along_axis(merged_rows, best, axis=1)
+        scores[batch] = np.take_along_axis(merged_scores, best, axis=1)
+    return KnnGraph(neighbors, scores)
+
+
+def refresh_knn_graph(index, embeddings: np.ndarray, k: int = SIMILAR_FOUNDERS_K,
+                      previous: Optional[Tuple[np.ndarray, KnnGraph]] = None) -> KnnGraph:
+    """Update the previous build's graph when few rows changed, otherwise build it from scratch.
+
+    Collections building their graphs at the same time take turns.
+    """
+    with _build_lock:
+        if previous is not None and previous[1].k == k:
+            changed = changed_rows(previous[0], embeddings)
+            if changed is not None and len(changed) <= MAX_INCREMENTAL_FRACTION * len(embeddings):
+                print(f"🔄 Updating kNN graph for {len(changed)} changed rows...")
+                return update_knn_graph(previous[1], index, embeddings, changed)
+
+        print(f"🔄 Building kNN graph (k={k}) for {len(embeddings)} rows...")
+        return build_knn_graph(index, embeddings, k)
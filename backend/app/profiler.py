@@ -0,0 +1,81 @@
+from collections import Counter
+from typing import Dict
+import os
+import sys
+import threading
+import time
+
+# Configuration
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+PROFILE_MIN_INTERVAL_MS = 1.0
+
+# Leaf functions of threads that are parked rather than working (event loop
+# select, idle executor workers, condition waits); dropped unless include_idle
+IDLE_LEAF_FUNCTIONS = {"select", "poll", "_worker", "wait", "_wait_for_tstate_lock", "accept"}
+
+_profile_lock = threading.Lock()
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (FileNotFoundError, ValueError):
+        import resource
+        # ru_maxrss is a high-water mark (KB on Linux, bytes on macOS) - the best we have
+        scale = 1e6 if sys.platform == "darwin" else 1e3
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class ProfileInProgress(Exception):
+    """Raised when a capture is requested while another one is running"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _sample_stacks(seconds: float, interval: float, include_idle: bool) -> Counter:
+    """Sample every thread's Python stack until the deadline"""
+    sampler_id = threading.get_ident()
+    counts: Counter = Counter()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        thread_names: Dict[int, str] = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler_id:
+                continue
+            if not include_idle and frame.f_code.co_name in IDLE_LEAF_FUNCTIONS:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return counts
+
+
+def capture_profile(seconds: float = 10.0, interval_ms: float = 10.0, include_idle: bool = False) -> str:
+    """Sample all threads for a bounded time and return folded stacks.
+
+    The output is the "folded" format (``frame;frame;frame count`` per line)
+    read by flamegraph.pl, speedscope and inferno. Nothing runs between
+    captures, and only one capture may run at a time.
+    """
+    seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+    interval = max(interval_ms, PROFILE_MIN_INTERVAL_MS) / 1000
+
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfileInProgress("A profile capture is already running")
+    try:
+        counts = _sample_stacks(seconds, interval, include_idle)
+    finally:
+        _profile_lock.release()
+
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
@@ -1,58 +1,160 @@
-import pandas as pd
+# Heavy dependencies (pandas, faiss, torch via the encoder, google.generativeai)
+# are imported inside the methods that need them so that importing this module -
+# and therefore app.main - stays cheap and the server can bind immediately.
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-import google.generativeai as genai
 import os
 import re
-from typing import List, Tuple
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
+from .datastore import DETAIL_COLUMNS, DatasetStore, load_precomputed_embeddings
+from .artifacts import RAG_ARTIFACT_DIR, SharedArtifacts, file_sha256
+from .semantic_cache import SEMANTIC_CACHE_DEPTH, SEMANTIC_CACHE_SIZE, SemanticQueryCache
+from .sharding import RAG_SHARD_BY, RAG_SHARD_MODE, RAG_SHARDS, ShardedIndex, partition_rows
+from .explanations import explanation_cache
+from .neighbors import SIMILAR_FOUNDERS_K, refresh_knn_graph
+from .serialization import encode_results, encode_similar, encode_static_fields
+from .metrics import EXPLANATION_FALLBACKS, EXPLANATION_SECONDS, GEMINI_ERRORS, span
 
 load_dotenv()
 
+# Any faiss.index_factory spec over inner product, e.g. "Flat", "HNSW32", "IVF1024,SQ8"
+FAISS_INDEX_FACTORY = os.getenv("FAISS_INDEX_FACTORY", "Flat")
+# Search-time knobs applied through faiss.ParameterSpace, e.g. "nprobe=16,efSearch=64"
+FAISS_SEARCH_PARAMS = os.getenv("FAISS_SEARCH_PARAMS", "")
+
+# Dataset file for the default collection: .csv, .parquet or .arrow (memory-mapped)
+RAG_DATASET_PATH = os.getenv("RAG_DATASET_PATH", "")
+# Columnar datasets load only the search columns; wide text columns are read on demand
+DATASET_PROJECT_COLUMNS = os.getenv("DATASET_PROJECT_COLUMNS", "true").lower() in ("1", "true", "yes")
+# Use <dataset>.embeddings.npy when it was built from this exact dataset file and encoder
+USE_PRECOMPUTED_EMBEDDINGS = os.getenv("USE_PRECOMPUTED_EMBEDDINGS", "true").lower() in ("1", "true", "yes")
+# Random (--embeddings synthetic) vectors give meaningless rankings; capacity tests must opt in
+ALLOW_SYNTHETIC_EMBEDDINGS = os.getenv("ALLOW_SYNTHETIC_EMBEDDINGS", "false").lower() in ("1", "true", "yes")
+
+STARTUP_PHASES = ["gemini", "dataset", "encoder", "embeddings", "index", "neighbors"]
+
+def founder_text(row) -> str:
+    """The text embedded for one founder row (shared with the dataset generator)"""
+    return (f"Founder: {row['founder_name']} | "
+            f"Role: {row['role']} | "
+            f"Company: {row['company']} | "
+            f"Location: {row['location']} | "
+            f"Stage: {row['stage']} | "
+            f"Keywords: {row['keywords']} | "
+            f"Idea: {row['idea']} | "
+            f"About: {row['about']}")
+
 class RAGService:
-    def __init__(self):
+    def __init__(self, name: str = "default"):
+        self.name = name
         self.model = None
         self.index = None
         self.founders_df = None
+        self._id_index = None
+        self.dataset_path = None
+        self.dataset_version = None
+        self.dataset_store = None
+        self.result_json = None
+        self.result_offsets = None
         self.embeddings = None
+        self.knn_graph = None
+        self.knn_thread = None
         self.gemini_model = None
+        self.query_cache = None
+        self.memory_bytes = 0
+        self.startup_status = "pending"
+        self.startup_phases = {name: {"status": "pending", "seconds": None} for name in STARTUP_PHASES}
+    
+    @contextmanager
+    def _phase(self, name: str):
+        """Time a startup phase and record its progress for /health"""
+        entry = self.startup_phases[name]
+        entry["status"] = "running"
+        start = time.perf_counter()
+        try:
+            yield
+            entry["status"] = "done"
+        except Exception:
+            entry["status"] = "failed"
+            raise
+        finally:
+            entry["seconds"] = round(time.perf_counter() - start, 3)
+            print(f"⏱️ Startup phase '{name}' {entry['status']} in {entry['seconds']:.2f}s")
+    
+    def startup(self) -> bool:
+        """Run every startup phase in order; blocking, so call it off the event loop"""
+        start = time.perf_counter()
+        self.startup_status = "loading"
         self._initialize_gemini()
+        
+        print("📊 Loading dataset...")
+        if not self.load_dataset():
+            print("❌ Failed to load dataset")
+            self.startup_status = "failed"
+            return False
+        
+        print("🧠 Initializing RAG system...")
+        if not self.initialize_embeddings():
+            print("❌ Failed to initialize RAG system")
+            self.startup_status = "failed"
+            return False
+        
+        self.startup_status = "ready"
+        print(f"✅ RAG system ready in {time.perf_counter() - start:.2f}s")
+        return True
     
     def _initialize_gemini(self):
         """Initialize Gemini API"""
         api_key = os.getenv("GOOGLE_API_KEY")
         if api_key:
             try:
-                genai.configure(api_key=api_key)
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+                with self._phase("gemini"):
+                    import google.generativeai as genai
+                    genai.configure(api_key=api_key)
+                    self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
                 print("✅ Gemini API initialized with gemini-1.5-flash")
             except Exception as e:
                 print(f"❌ Gemini API initialization failed: {e}")
                 self.gemini_model = None
         else:
+            self.startup_phases["gemini"]["status"] = "skipped"
             print("❌ No Gemini API key found")
     
-    def load_dataset(self) -> bool:
+    def load_dataset(self, path: Optional[str] = None) -> bool:
         """Load the founders dataset"""
         try:
-            # Try different path possibilities
-            paths = [
-                "../data/founders_dataset.csv",
-                "data/founders_dataset.csv", 
-                "./data/founders_dataset.csv"
-            ]
-            
-            for path in paths:
-                try:
-                    self.founders_df = pd.read_csv(path)
-                    print(f"✅ Loaded {len(self.founders_df)} founder records from {path}")
-                    return True
-                except FileNotFoundError:
-                    continue
-            
-            print("❌ Could not find founders_dataset.csv in any expected location")
-            return False
+            with self._phase("dataset"):
+                # Try different path possibilities
+                requested = path or RAG_DATASET_PATH
+                paths = [requested] if requested else [
+                    "../data/founders_dataset.csv",
+                    "data/founders_dataset.csv", 
+                    "./data/founders_dataset.csv"
+                ]
+                
+                for candidate in paths:
+                    try:
+                        store = DatasetStore(candidate)
+                        founders_df = store.load(project=DATASET_PROJECT_COLUMNS)
+                        self._id_index = None
+                        self.dataset_store = store
+                        self.dataset_path = candidate
+                        stat = os.stat(candidate)
+                        self.dataset_version = f"{os.path.abspath(candidate)}:{stat.st_size}:{stat.st_mtime_ns}"
+                        # Static result fields are serialized once here instead of on every search
+                        self.result_json, self.result_offsets = encode_static_fields(founders_df)
+                        # Published last: requests treat a set founders_df as a fully loaded dataset
+                        self.founders_df = founders_df
+                        print(f"✅ Loaded {len(self.founders_df)} founder records from {candidate} ({store.format})")
+                        return True
+                    except FileNotFoundError:
+                        continue
+                
+                raise FileNotFoundError(f"Could not find {requested or 'founders_dataset.csv'} in any expected location")
             
         except Exception as e:
             print(f"❌ Error loading dataset: {e}")
@@ -65,89 +167,305 @@ class RAGService:
                 print("❌ Dataset not loaded")
                 return False
             
-            # Load sentence transformer model
-            print("🔄 Loading sentence transformer model...")
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            # Load sentence transformer model (torch or ONNX Runtime backend)
+            with self._phase("encoder"):
+                from .encoders import get_shared_encoder
+                print("🔄 Loading sentence transformer model...")
+                model = get_shared_encoder()
             
-            # Create comprehensive text for embedding
-            texts = []
-            for _, row in self.founders_df.iterrows():
-                text = (f"Founder: {row['founder_name']} | "
-                       f"Role: {row['role']} | "
-                       f"Company: {row['company']} | "
-                       f"Location: {row['location']} | "
-                       f"Stage: {row['stage']} | "
-                       f"Keywords: {row['keywords']} | "
-                       f"Idea: {row['idea']} | "
-                       f"About: {row['about']}")
-                texts.append(text)
+            if RAG_ARTIFACT_DIR:
+                # Multi-worker mode: build once, memory-map everywhere
+                with self._phase("index"):
+                    artifacts = SharedArtifacts(os.path.join(RAG_ARTIFACT_DIR, self.name),
+                                                self._artifact_fingerprint(model))
+                    embeddings, index = artifacts.load_or_build(
+                        lambda: self._build_embeddings(model), self._build_search_index)
+                    if FAISS_SEARCH_PARAMS and isinstance(index, ShardedIndex):
+                        index.set_search_params(FAISS_SEARCH_PARAMS)
+                    elif FAISS_SEARCH_PARAMS:
+                        import faiss
+                        faiss.ParameterSpace().set_index_parameters(index, FAISS_SEARCH_PARAMS)
+                if self.startup_phases["embeddings"]["status"] == "pending":
+                    self.startup_phases["embeddings"]["status"] = "mapped"
+            else:
+                artifacts = None
+                embeddings = self._build_embeddings(model)
+                with self._phase("index"):
+                    index = self._build_search_index(embeddings)
+                    if isinstance(index, ShardedIndex) and RAG_SHARD_MODE == "process":
+                        index = self._start_shard_processes(index)
             
-            # Generate embeddings
-            print("🔄 Generating embeddings...")
-            self.embeddings = self.model.encode(texts, show_progress_bar=True)
-            
-            # Create FAISS index
-            print("🔄 Creating FAISS index...")
-            dimension = self.embeddings.shape[1]
-            self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
-            
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(self.embeddings)
-            self.index.add(self.embeddings.astype('float32'))
+            # Publish only fully built state so concurrent requests never see a partial index
+            self.embeddings = embeddings
+            self.model = model
+            self.index = index
+            if SEMANTIC_CACHE_SIZE > 0 and self.query_cache is None:
+                self.query_cache = SemanticQueryCache(embeddings.shape[1])
             
+            self.memory_bytes = self._estimate_memory_bytes()
             print(f"✅ RAG system initialized with {len(self.embeddings)} embeddings")
+            self._start_knn_graph(index, embeddings, artifacts)
             return True
             
         except Exception as e:
             print(f"❌ Error initializing RAG system: {e}")
             return False
     
-    def search_founders(self, query: str, limit: int = 5) -> List[dict]:
+    def _estimate_memory_bytes(self) -> int:
+        """Approximate private memory held by this dataset: dataframe, encoded results, embeddings and index"""
+        total = int(self.founders_df.memory_usage(deep=True).sum())
+        total += len(self.result_json) + self.result_offsets.nbytes
+        if isinstance(self.embeddings, np.ndarray) and not isinstance(self.embeddings, np.memmap):
+            total += self.embeddings.nbytes * 2  # the flat index keeps its own copy of the vectors
+        if self.knn_graph is not None and not isinstance(self.knn_graph.neighbors, np.memmap):
+            total += self.knn_graph.nbytes
+        return total
+    
+    def _artifact_fingerprint(self, model) -> str:
+        """Identify the dataset + encoder combination the shared artifacts were built from"""
+        quantized = getattr(model, "quantized", False)
+        sharding = f"{RAG_SHARDS}/{RAG_SHARD_BY}" if RAG_SHARDS > 1 else "1"
+        return (f"{file_sha256(self.dataset_path)}:{model.backend}:{model.model_name}:{quantized}:"
+                f"{FAISS_INDEX_FACTORY}:{sharding}")
+    
+    def founder_texts(self) -> List[str]:
+        """Create comprehensive text for embedding, one per founder row"""
+        return [founder_text(row) for _, row in self.founders_df.iterrows()]
+    
+    def _build_embeddings(self, model, precomputed: bool = True) -> np.ndarray:
+        """Encode every founder row into a normalized float32 matrix.
+        
+        precomputed=False always encodes with this model, ignoring any sidecar (the
+        eval harness scores each encoder on its own vectors).
+        """
+        with self._phase("embeddings"):
+            import faiss
+            
+            # Embeddings shipped next to the dataset (data/generate_dataset.py --embeddings)
+            if precomputed and USE_PRECOMPUTED_EMBEDDINGS:
+                embeddings = load_precomputed_embeddings(self.dataset_path, len(self.founders_df), model,
+                                                         allow_synthetic=ALLOW_SYNTHETIC_EMBEDDINGS)
+                if embeddings is not None:
+                    return embeddings
+            
+            # Generate embeddings
+            print("🔄 Generating embeddings...")
+            texts = self.founder_texts()
+            embeddings = np.ascontiguousarray(model.encode(texts, show_progress_bar=True), dtype=np.float32)
+            
+            # Normalize embeddings for cosine similarity
+            faiss.normalize_L2(embeddings)
+            return embeddings
+    
+    def _build_index(self, embeddings: np.ndarray, spec: str = None, search_params: str = None):
+        """Create the FAISS index over normalized embeddings"""
+        import faiss
+        
+        spec = spec or FAISS_INDEX_FACTORY
+        search_params = FAISS_SEARCH_PARAMS if search_params is None else search_params
+        print(f"🔄 Creating FAISS index ({spec})...")
+        if spec == "Flat":
+            index = faiss.IndexFlatIP(embeddings.shape[1])  # Inner product for cosine similarity
+        else:
+            index = faiss.index_factory(embeddings.shape[1], spec, faiss.METRIC_INNER_PRODUCT)
+            if not index.is_trained:
+                index.train(embeddings)
+        index.add(embeddings)
+        
+        if search_params:
+            faiss.ParameterSpace().set_index_parameters(index, search_params)
+        return index
+    
+    def _build_search_index(self, embeddings: np.ndarray):
+        """The serving index: one FAISS index, or RAG_SHARDS of them behind a ShardedIndex"""
+        if RAG_SHARDS <= 1:
+            return self._build_index(embeddings)
+        print(f"🔄 Partitioning {len(embeddings)} rows into {RAG_SHARDS} shards by '{RAG_SHARD_BY}'...")
+        partitions = partition_rows(self.founders_df, RAG_SHARDS, RAG_SHARD_BY)
+        return ShardedIndex.build(embeddings, partitions, self._build_index)
+    
+    def _start_knn_graph(self, index, embeddings: np.ndarray, artifacts: Optional[SharedArtifacts]):
+        """Map a current similar-founders graph, or build it in the background while search is served.
+        
+        Until the graph is ready, similar_founders searches the index with the stored embedding.
+        """
+        if SIMILAR_FOUNDERS_K <= 0:
+            self.startup_phases["neighbors"]["status"] = "skipped"
+            return
+        if artifacts is not None:
+            graph = artifacts.map_knn(SIMILAR_FOUNDERS_K)
+            if graph is not None:
+                self.knn_graph = graph
+                self.startup_phases["neighbors"]["status"] = "mapped"
+                return
+        self.knn_thread = threading.Thread(target=self._build_knn_graph, args=(index, embeddings, artifacts),
+                                           name=f"knn-{self.name}", daemon=True)
+        self.knn_thread.start()
+    
+    def _build_knn_graph(self, index, embeddings: np.ndarray, artifacts: Optional[SharedArtifacts]):
+        """Similar-founder lists for every row, from batched searches with the stored embeddings"""
+        try:
+            with self._phase("neighbors"):
+                if artifacts is not None:
+                    graph = artifacts.load_or_build_knn(index, embeddings, SIMILAR_FOUNDERS_K)
+                else:
+                    graph = refresh_knn_graph(index, embeddings, SIMILAR_FOUNDERS_K)
+            self.knn_graph = graph
+            self.memory_bytes = self._estimate_memory_bytes()
+        except Exception as e:
+            print(f"❌ Error building kNN graph: {e}")
+    
+    def _start_shard_processes(self, index: ShardedIndex) -> ShardedIndex:
+        """Hand in-memory shards to worker processes through a private scratch directory"""
+        import tempfile
+        
+        directory = tempfile.mkdtemp(prefix=f"rag-shards-{self.name}-")
+        try:
+            index.save(lambda name, write: write(os.path.join(directory, name)))
+            sharded = ShardedIndex.load(directory, len(index.shards), index.d, mode="process")
+        except Exception:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        sharded.scratch_dir = directory
+        return sharded
+    
+    def close(self):
+        """Stop shard worker processes and remove their scratch files"""
+        if isinstance(self.index, ShardedIndex):
+            self.index.close()
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        import faiss
+        
+        with span("encode"):
+            query_embedding = np.ascontiguousarray(self.model.encode([query]), dtype=np.float32)
+            faiss.normalize_L2(query_embedding)
+        return query_embedding
+    
+    def rank(self, query: str, limit: int = 5) -> Tuple[str, np.ndarray, np.ndarray]:
+        """Encode the query and return (ranked query, scores, row indices) from the FAISS index.
+        
+        A near-duplicate of a recent query reuses that query's ranking, and the
+        returned text is the query the ranking belongs to, so explanations are
+        generated (and cached) for the canonical wording.
+        """
+        query_embedding = self._encode_query(query)
+        if self.query_cache is None:
+            with span("faiss_search"):
+                scores, indices = self.index.search(query_embedding, limit)
+            return query, scores[0], indices[0]
+        
+        with span("semantic_cache"):
+            cached = self.query_cache.lookup(query_embedding[0], limit, self.dataset_version)
+        if cached is not None:
+            return cached
+        
+        with span("faiss_search"):
+            scores, indices = self.index.search(query_embedding, max(limit, SEMANTIC_CACHE_DEPTH))
+        self.query_cache.store(query_embedding[0], query, scores[0], indices[0], self.dataset_version)
+        return query, scores[0][:limit], indices[0][:limit]
+    
+    def search_founders(self, query: str, limit: int = 5, lazy: bool = False) -> List[dict]:
         """Search for founders using vector similarity"""
         try:
             if self.model is None or self.index is None:
                 return []
             
-            # Generate query embedding
-            query_embedding = self.model.encode([query])
-            faiss.normalize_L2(query_embedding)
-            
-            # Search FAISS index
-            scores, indices = self.index.search(query_embedding.astype('float32'), limit)
-            
-            results = []
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(self.founders_df):
-                    founder = self.founders_df.iloc[idx]
-                    
-                    # Generate explanation using Gemini
-                    snippet = self.generate_match_explanation_gemini(query, founder)
-                    matched_fields = self.identify_matched_fields(query, founder)
-                    
-                    result = {
-                        "id": founder['id'],
-                        "founder_name": founder['founder_name'],
-                        "role": founder['role'],
-                        "company": founder['company'],
-                        "location": founder['location'],
-                        "snippet": snippet,
-                        "similarity_score": float(score),
-                        "matched_fields": matched_fields,
-                        "row_id": int(idx)
-                    }
-                    results.append(result)
-            
-            return results
+            ranked_query, scores, indices = self.rank(query, limit)
+            return self.materialize_results(query, scores, indices, lazy, explain_query=ranked_query)
             
         except Exception as e:
             print(f"❌ Error in search: {e}")
             return []
     
+    def materialize_results(self, query: str, scores, indices, lazy: bool = False,
+                            explain_query: Optional[str] = None) -> List[dict]:
+        """Build result dicts for already ranked rows; lazy uses the rule-based snippet instead of Gemini.
+        
+        Matched fields and rule-based snippets describe the caller's query.
+        Gemini explanations use explain_query (the ranked query from rank(),
+        default query) so a semantic cache hit shares the cached explanations.
+        """
+        explain_query = explain_query or query
+        results = []
+        for i, (score, idx) in enumerate(zip(scores, indices)):
+            if 0 <= idx < len(self.founders_df):
+                with span("materialize"):
+                    founder = self.founders_df.iloc[idx]
+                
+                # Generate explanation using Gemini (cached), or defer it to /explain
+                with span("explanation"):
+                    if lazy:
+                        snippet = self.generate_match_explanation_fallback(query, founder)
+                    else:
+                        snippet = self.explain(explain_query, founder)
+                with span("matched_fields"):
+                    matched_fields = self.identify_matched_fields(query, founder)
+                
+                result = {
+                    "id": founder['id'],
+                    "founder_name": founder['founder_name'],
+                    "role": founder['role'],
+                    "company": founder['company'],
+                    "location": founder['location'],
+                    "snippet": snippet,
+                    "similarity_score": float(score),
+                    "matched_fields": matched_fields,
+                    "row_id": int(idx)
+                }
+                results.append(result)
+        
+        return results
+    
+    def encode_results(self, results: List[dict]) -> bytes:
+        """JSON body (List[FounderResult]) for materialized results, using the pre-encoded static fields"""
+        with span("serialize"):
+            return encode_results(results, self.result_json, self.result_offsets)
+    
+    def similar_founders(self, founder_id: str, limit: int = 5) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(rows, scores) of the founders most like one founder, or None if the ID is unknown"""
+        row = self._founder_row(founder_id)
+        if row is None:
+            return None
+        
+        with span("similar"):
+            if self.knn_graph is not None and limit <= self.knn_graph.k:
+                return self.knn_graph.lookup(row, limit)
+            
+            # No graph, or a longer list than it holds: search with the stored embedding (still no encoding)
+            query_embedding = np.ascontiguousarray(self.embeddings[row:row + 1], dtype=np.float32)
+            scores, indices = self.index.search(query_embedding, limit + 1)
+            keep = (indices[0] >= 0) & (indices[0] != row)
+            return indices[0][keep][:limit], scores[0][keep][:limit]
+    
+    def encode_similar(self, rows: np.ndarray, scores: np.ndarray) -> bytes:
+        """JSON body (List[SimilarFounder]) for similar-founder rows"""
+        with span("serialize"):
+            return encode_similar(rows, scores, self.result_json, self.result_offsets)
+    
+    def explain(self, query: str, founder) -> str:
+        """Match explanation for one (query, founder) pair, generated at most once per dataset version"""
+        key = (self.dataset_version, query, founder['id'])
+        return explanation_cache.get_or_compute(key, lambda: self._generate_explanation(query, founder))
+    
+    def explain_founder(self, query: str, founder_id: str) -> Optional[str]:
+        """Explanation for a founder looked up by ID, or None if the ID is unknown"""
+        row = self._founder_row(founder_id)
+        if row is None:
+            return None
+        return self.explain(query, self.founders_df.iloc[row])
+    
     def generate_match_explanation_gemini(self, query: str, founder) -> str:
         """Generate match explanation using Gemini"""
+        return self._generate_explanation(query, founder)[0]
+    
+    def _generate_explanation(self, query: str, founder) -> Tuple[str, bool]:
+        """Gemini explanation (or fallback) plus whether it may be cached - Gemini errors are retried"""
+        start = time.perf_counter()
         try:
             if self.gemini_model is None:
-                return self.generate_match_explanation_fallback(query, founder)
+                EXPLANATION_FALLBACKS.labels("gemini_unavailable").inc()
+                return self.generate_match_explanation_fallback(query, founder), True
             
             prompt = f"""
             Query: "{query}"
@@ -169,11 +487,15 @@ class RAGService:
             """
             
             response = self.gemini_model.generate_content(prompt)
-            return response.text.strip()
+            EXPLANATION_SECONDS.labels("gemini").observe(time.perf_counter() - start)
+            return response.text.strip(), True
             
         except Exception as e:
+            EXPLANATION_SECONDS.labels("gemini_error").observe(time.perf_counter() - start)
+            GEMINI_ERRORS.inc()
+            EXPLANATION_FALLBACKS.labels("gemini_error").inc()
             print(f"❌ Gemini API error: {e}")
-            return self.generate_match_explanation_fallback(query, founder)
+            return self.generate_match_explanation_fallback(query, founder), False
     
     def generate_match_explanation_fallback(self, query: str, founder) -> str:
         """Fallback explanation generation without Gemini"""
@@ -236,17 +558,38 @@ class RAGService:
         
         return matched if matched else ["keywords", "about"]
     
+    def _founder_row(self, founder_id: str) -> Optional[int]:
+        """Row number of a founder ID (the first one if duplicated), via a hash index built on first use"""
+        if self._id_index is None:
+            import pandas as pd
+            self._id_index = pd.Index(self.founders_df['id'])
+        try:
+            loc = self._id_index.get_loc(founder_id)
+        except KeyError:
+            return None
+        if isinstance(loc, slice):
+            return loc.start
+        if isinstance(loc, np.ndarray):
+            return int(np.argmax(loc))
+        return int(loc)
+    
     def get_founder_by_id(self, founder_id: str) -> dict:
         """Get founder details by ID"""
         if self.founders_df is None:
             return None
         
-        founder_row = self.founders_df[self.founders_df['id'] == founder_id]
-        if len(founder_row) == 0:
+        row = self._founder_row(founder_id)
+        if row is None:
             return None
         
         # Convert row to dict and handle NaN values
-        founder_dict = founder_row.iloc[0].to_dict()
+        import pandas as pd
+        
+        founder_dict = self.founders_df.iloc[row].to_dict()
+        missing = [c for c in DETAIL_COLUMNS if c not in founder_dict]
+        if missing:
+            # Wide text columns left out of a columnar projection
+            founder_dict.update(self.dataset_store.row_values(row, missing))
         for key, value in founder_dict.items():
             if pd.isna(value):  # Check if value is NaN
                 founder_dict[key] = None
@@ -258,6 +601,8 @@ class RAGService:
         if self.founders_df is None:
             return {"error": "Dataset not loaded"}
         
+        import pandas as pd
+        
         # Basic stats
         total_founders = len(self.founders_df)
         unique_locations = self.founders_df['location'].nunique()
@@ -347,7 +692,8 @@ class RAGService:
         
         # Email domain analysis for company diversity
         domains = []
-        for email in self.founders_df['email']:
+        emails = self.founders_df['email'] if 'email' in self.founders_df else self.dataset_store.column('email')
+        for email in emails:
             if pd.notna(email) and '@' in email:
                 domain = email.split('@')[1].split('.')[0]
                 domains.append(domain)
@@ -395,6 +741,10 @@ class RAGService:
             }
         }
     
+    def is_dataset_loaded(self) -> bool:
+        """True once founder lookups and stats can be served (before the index is ready)"""
+        return self.founders_df is not None
+    
     def is_ready(self) -> bool:
         """Check if RAG system is ready"""
         return (self.founders_df is not None and 
@@ -0,0 +1,215 @@
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set
+from dotenv import load_dotenv
+import os
+import threading
+import time
+
+from .metrics import CACHE_EVENTS
+from .rag import RAGService, rag_service
+
+load_dotenv()
+
+# Configuration - extra named datasets, e.g. "eu=../data/eu_founders.csv,us=/srv/data/us.csv"
+RAG_COLLECTIONS = os.getenv("RAG_COLLECTIONS", "")
+# Resident memory allowed for non-default collections; 0 disables eviction
+RAG_MEMORY_BUDGET_MB = float(os.getenv("RAG_MEMORY_BUDGET_MB", "0"))
+
+DEFAULT_COLLECTION = "default"
+
+
+class CollectionNotFound(KeyError):
+    """Raised for a collection name that is not configured"""
+
+
+class CollectionLoadError(RuntimeError):
+    """Raised when a configured collection fails to load"""
+
+
+def parse_collections(config: str) -> Dict[str, str]:
+    collections = {}
+    for entry in filter(None, (e.strip() for e in config.split(","))):
+        name, _, path = entry.partition("=")
+        if not name.strip() or not path.strip():
+            print(f"❌ Ignoring malformed RAG_COLLECTIONS entry '{entry}'")
+            continue
+        collections[name.strip()] = path.strip()
+    return collections
+
+
+# Leases taken during the current request, released by the HTTP middleware once it completes
+_request_leases: ContextVar[Optional[List[RAGService]]] = ContextVar("request_leases", default=None)
+
+
+def begin_request_leases() -> List[RAGService]:
+    """Start collecting collection leases for the current request; returns the (mutable) lease list"""
+    leases: List[RAGService] = []
+    _request_leases.set(leases)
+    return leases
+
+
+class CollectionRegistry:
+    """Named datasets, each with its own dataframe, embeddings, index and stats.
+
+    The default collection is the global rag_service and is always resident.
+    Other collections load on first use and sit in an LRU; when their
+    estimated memory exceeds the budget the least recently used ones are
+    dropped and will reload on next use. All of them share one encoder.
+
+    Requests lease the collection they use. An evicted collection leaves the
+    LRU at once but is only closed when its last lease is released, and
+    always outside the registry lock.
+    """
+
+    def __init__(self, default_service: RAGService, paths: Dict[str, str], budget_mb: float = 0):
+        self.default_service = default_service
+        self.paths = paths
+        self.budget_bytes = int(budget_mb * 1e6)
+        self._resident: "OrderedDict[str, RAGService]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._leases: Dict[RAGService, int] = {}
+        # Evicted but still leased; closed by the last release
+        self._retired: Set[RAGService] = set()
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in paths}
+
+    def names(self) -> List[str]:
+        return [DEFAULT_COLLECTION] + sorted(self.paths)
+
+    def resident(self, name: Optional[str], lease: bool = False) -> Optional[RAGService]:
+        """The collection's service if it is already in memory (never loads).
+
+        With lease=True the caller must hand the service back to release().
+        """
+        if not name or name == DEFAULT_COLLECTION:
+            return self.default_service
+        with self._lock:
+            service = self._resident.get(name)
+            if service is not None:
+                self._resident.move_to_end(name)
+                self._last_used[name] = time.time()
+                if lease:
+                    self._leases[service] = self._leases.get(service, 0) + 1
+            return service
+
+    def get(self, name: Optional[str], lease: bool = False) -> RAGService:
+        """Return a ready collection, loading it if cold; blocking, so call off the event loop"""
+        if name and name != DEFAULT_COLLECTION and name not in self.paths:
+            raise CollectionNotFound(name)
+
+        service = self.resident(name, lease)
+        if service is not None:
+            CACHE_EVENTS.labels("collection", "hit").inc()
+            return service
+
+        # One loader per collection; concurrent requests for it wait here
+        with self._load_locks[name]:
+            service = self.resident(name, lease)
+            if service is not None:
+                CACHE_EVENTS.labels("collection", "hit").inc()
+                return service
+
+            CACHE_EVENTS.labels("collection", "miss").inc()
+            service = self._load(name)
+            with self._lock:
+                self._resident[name] = service
+                self._last_used[name] = time.time()
+                if lease:
+                    self._leases[service] = 1
+                evicted = self._evict(keep=name)
+        for stale in evicted:
+            stale.close()
+        return service
+
+    def lease(self, name: Optional[str], load: bool = True) -> Optional[RAGService]:
+        """get() (or resident() without load) for the current request, released when the request completes"""
+        leases = _request_leases.get()
+        if load:
+            service = self.get(name, lease=leases is not None)
+        else:
+            service = self.resident(name, lease=leases is not None)
+        if leases is not None and service is not None and service is not self.default_service:
+            leases.append(service)
+        return service
+
+    def release(self, service: RAGService):
+        """Drop one lease; the last one on an evicted collection closes it"""
+        if service is self.default_service:
+            return
+        with self._lock:
+            remaining = self._leases.get(service, 0) - 1
+            if remaining > 0:
+                self._leases[service] = remaining
+                return
+            self._leases.pop(service, None)
+            if service not in self._retired:
+                return
+            self._retired.discard(service)
+        service.close()
+
+    def _load(self, name: str) -> RAGService:
+        start = time.perf_counter()
+        print(f"📦 Loading collection '{name}' from {self.paths[name]}...")
+        service = RAGService(name=name)
+        service.gemini_model = self.default_service.gemini_model
+        if not (service.load_dataset(self.paths[name]) and service.initialize_embeddings()):
+            raise CollectionLoadError(f"Collection '{name}' failed to load")
+        service.startup_status = "ready"
+        print(f"✅ Collection '{name}' resident ({service.memory_bytes / 1e6:.1f} MB) "
+              f"in {time.perf_counter() - start:.2f}s")
+        return service
+
+    def _evict(self, keep: str) -> List[RAGService]:
+        """Drop least recently used collections until the budget fits (caller holds _lock).
+
+        Returns the unleased ones for the caller to close once it drops the
+        lock; leased ones are retired and closed by their last release().
+        """
+        if not self.budget_bytes:
+            return []
+        to_close = []
+        total = sum(s.memory_bytes for s in self._resident.values())
+        for name in list(self._resident):
+            if total <= self.budget_bytes:
+                break
+            if name == keep:
+                continue
+            evicted = self._resident.pop(name)
+            total -= evicted.memory_bytes
+            if self._leases.get(evicted):
+                self._retired.add(evicted)
+            else:
+                to_close.append(evicted)
+            print(f"♻️ Evicted collection '{name}' ({evicted.memory_bytes / 1e6:.1f} MB)")
+        return to_close
+
+    def close(self):
+        """Release every collection's index workers (default and retired collections included)"""
+        with self._lock:
+            services = [self.default_service, *self._resident.values(), *self._retired]
+            self._resident.clear()
+            self._retired.clear()
+            self._leases.clear()
+        for service in services:
+            service.close()
+
+    def status(self) -> List[dict]:
+        with self._lock:
+            resident = dict(self._resident)
+        collections = []
+        for name in self.names():
+            service = self.default_service if name == DEFAULT_COLLECTION else resident.get(name)
+            collections.append({
+                "name": name,
+                "resident": service is not None,
+                "ready": service.is_ready() if service is not None else False,
+                "total_founders": len(service.founders_df) if service is not None and service.founders_df is not None else 0,
+                "memory_mb": round(service.memory_bytes / 1e6, 1) if service is not None else 0.0,
+                "last_used": self._last_used.get(name),
+            })
+        return collections
+
+
+# Global collection registry
+collection_registry = CollectionRegistry(rag_service, parse_collections(RAG_COLLECTIONS), RAG_MEMORY_BUDGET_MB)
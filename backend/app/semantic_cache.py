@@ -0,0 +1,108 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+import numpy as np
+import os
+import threading
+import time
+
+from .metrics import CACHE_EVENTS
+
+load_dotenv()
+
+# Configuration - a size of 0 disables the cache
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1024"))
+# Minimum cosine similarity between query embeddings to reuse a ranking
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "600"))
+# Rankings are cached this deep so later requests with a larger limit still hit
+SEMANTIC_CACHE_DEPTH = int(os.getenv("SEMANTIC_CACHE_DEPTH", "20"))
+
+
+class _Entry:
+    __slots__ = ("query", "scores", "indices", "expires_at")
+
+    def __init__(self, query: str, scores: np.ndarray, indices: np.ndarray, expires_at: float):
+        self.query = query
+        self.scores = scores
+        self.indices = indices
+        self.expires_at = expires_at
+
+
+class SemanticQueryCache:
+    """Rankings of recent queries, found by embedding similarity rather than exact text.
+
+    Query vectors live in a small exact inner-product index. A new query
+    whose nearest cached vector is within the cosine threshold reuses that
+    query's ranking and text, so the explanation cache is shared too. Entries
+    expire after a TTL, the oldest are dropped past the size bound, and the
+    whole cache is cleared when the dataset version changes.
+    """
+
+    def __init__(self, dimension: int, max_entries: int = SEMANTIC_CACHE_SIZE,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: float = SEMANTIC_CACHE_TTL_SECONDS):
+        import faiss
+
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_ids):
+        ids = np.asarray(entry_ids, dtype=np.int64)
+        self.index.remove_ids(ids)
+        for entry_id in entry_ids:
+            self._entries.pop(int(entry_id), None)
+
+    def _check_version(self, version: Optional[str]):
+        if version != self.version:
+            self.index.reset()
+            self._entries.clear()
+            self.version = version
+
+    def clear(self):
+        with self._lock:
+            self.index.reset()
+            self._entries.clear()
+
+    def lookup(self, vector: np.ndarray, limit: int, version: Optional[str]) -> Optional[Tuple[str, np.ndarray, np.ndarray]]:
+        """(cached query text, scores, indices) for a near-duplicate query, else None"""
+        with self._lock:
+            self._check_version(version)
+            if not self._entries:
+                CACHE_EVENTS.labels("semantic_query", "miss").inc()
+                return None
+
+            similarity, ids = self.index.search(vector[None, :], 1)
+            entry_id = int(ids[0][0])
+            entry = self._entries.get(entry_id)
+            if entry is not None and entry.expires_at < time.monotonic():
+                self._remove([entry_id])
+                CACHE_EVENTS.labels("semantic_query", "expired").inc()
+                return None
+            if entry is None or similarity[0][0] < self.threshold or len(entry.indices) < limit:
+                CACHE_EVENTS.labels("semantic_query", "miss").inc()
+                return None
+
+            self._entries.move_to_end(entry_id)
+        CACHE_EVENTS.labels("semantic_query", "hit").inc()
+        return entry.query, entry.scores[:limit], entry.indices[:limit]
+
+    def store(self, vector: np.ndarray, query: str, scores: np.ndarray, indices: np.ndarray, version: Optional[str]):
+        with self._lock:
+            self._check_version(version)
+            entry_id = self._next_id
+            self._next_id += 1
+            self.index.add_with_ids(vector[None, :], np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = _Entry(query, scores.copy(), indices.copy(), time.monotonic() + self.ttl)
+
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                self._remove(list(self._entries)[:overflow])
@@ -0,0 +1,59 @@
+from fastapi import Response
+from typing import List, Optional, Tuple
+import numpy as np
+import orjson
+
+# FounderResult fields that never change for a row, in schema order
+STATIC_RESULT_FIELDS = ["id", "founder_name", "role", "company", "location"]
+
+
+class JSONBytesResponse(Response):
+    """A body that is already JSON; endpoints keep their response_model for the OpenAPI schema"""
+
+    media_type = "application/json"
+
+
+def encode_static_fields(founders_df) -> Tuple[bytes, np.ndarray]:
+    """Pre-encode each row's static FounderResult fields once, as one buffer plus row offsets.
+
+    Each slice is an unterminated JSON object (``{"id":...,"location":...``)
+    that encode_results completes with the per-query fields. Values are
+    validated here: missing text becomes "", matching the str schema.
+    """
+    columns = [founders_df[name].fillna("").astype(str).tolist() for name in STATIC_RESULT_FIELDS]
+    parts = [orjson.dumps(dict(zip(STATIC_RESULT_FIELDS, values)))[:-1] for values in zip(*columns)]
+
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([len(part) for part in parts], out=offsets[1:])
+    return b"".join(parts), offsets
+
+
+def encode_results(results: List[dict], static_json: bytes, offsets: np.ndarray) -> bytes:
+    """JSON array of FounderResult objects from result dicts and the pre-encoded static fields"""
+    items = []
+    for result in results:
+        row = result["row_id"]
+        dynamic = orjson.dumps({
+            "snippet": result["snippet"],
+            "similarity_score": result["similarity_score"],
+            "matched_fields": result["matched_fields"],
+            "row_id": row,
+            "explanation_token": result.get("explanation_token"),
+        })
+        items.append(static_json[offsets[row]:offsets[row + 1]] + b"," + dynamic[1:])
+    return b"[" + b",".join(items) + b"]"
+
+
+def encode_similar(rows: np.ndarray, scores: np.ndarray, static_json: bytes, offsets: np.ndarray) -> bytes:
+    """JSON array of SimilarFounder objects: the pre-encoded static fields plus score and row"""
+    items = []
+    for row, score in zip(rows.tolist(), scores.tolist()):
+        dynamic = orjson.dumps({"similarity_score": score, "row_id": row})
+        items.append(static_json[offsets[row]:offsets[row + 1]] + b"," + dynamic[1:])
+    return b"[" + b",".join(items) + b"]"
+
+
+def encode_search_page(results_json: bytes, next_cursor: Optional[str], total_candidates: int) -> bytes:
+    """SearchPage object around an already encoded results array"""
+    return (b'{"results":' + results_json + b',"next_cursor":' + orjson.dumps(next_cursor)
+            + b',"total_candidates":' + orjson.dumps(total_candidates) + b"}")
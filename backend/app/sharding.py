@@ -0,0 +1,214 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+from dotenv import load_dotenv
+import heapq
+import itertools
+import multiprocessing
+import numpy as np
+import os
+import shutil
+import zlib
+
+load_dotenv()
+
+# Configuration - 1 shard keeps the single FAISS index
+RAG_SHARDS = int(os.getenv("RAG_SHARDS", "1"))
+# "id" spreads rows evenly by a hash of the founder id; any other column
+# (e.g. "stage", "location") keeps rows with the same value in one shard
+RAG_SHARD_BY = os.getenv("RAG_SHARD_BY", "id")
+# "thread" searches every shard on a thread pool (FAISS releases the GIL);
+# "process" serves each shard from its own local worker process
+RAG_SHARD_MODE = os.getenv("RAG_SHARD_MODE", "thread")
+RAG_SHARD_THREADS = int(os.getenv("RAG_SHARD_THREADS", "0")) or RAG_SHARDS
+
+_search_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    global _search_pool
+    if _search_pool is None:
+        _search_pool = ThreadPoolExecutor(max_workers=RAG_SHARD_THREADS, thread_name_prefix="shard-search")
+    return _search_pool
+
+
+def mmap_read_flags() -> int:
+    """read_index flags that map an index file read-only without copying it into the heap.
+
+    Plain IO_FLAG_MMAP still copies flat indexes into every process, which
+    is exactly what shared mode exists to avoid, so there is no fallback.
+    """
+    import faiss
+    if not hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        raise RuntimeError(f"faiss {faiss.__version__} cannot map indexes zero-copy (IO_FLAG_MMAP_IFC); "
+                           "install faiss-cpu>=1.11.0")
+    return faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+
+
+def shard_index_file(shard: int) -> str:
+    return f"index.{shard}.faiss"
+
+
+def shard_ids_file(shard: int) -> str:
+    return f"ids.{shard}.npy"
+
+
+def partition_rows(founders_df, shards: int, shard_by: str = "id") -> List[np.ndarray]:
+    """Row numbers per shard, from a stable (process-independent) hash of the shard column"""
+    values = founders_df[shard_by].astype(str)
+    assignments = np.fromiter((zlib.crc32(v.encode()) % shards for v in values), dtype=np.int64, count=len(values))
+    return [np.flatnonzero(assignments == shard) for shard in range(shards)]
+
+
+def _shard_hits(scores: np.ndarray, local_ids: np.ndarray, rows: np.ndarray):
+    """(score, dataframe row) pairs for one query's results from one shard"""
+    for score, local_id in zip(scores, local_ids):
+        if local_id >= 0:
+            yield float(score), int(rows[local_id])
+
+
+class LocalShard:
+    """A shard index held in this process and searched on the shared thread pool"""
+
+    def __init__(self, index):
+        self.index = index
+        self.ntotal = index.ntotal
+
+    def submit(self, queries: np.ndarray, k: int) -> Future:
+        return _get_search_pool().submit(self.index.search, queries, k)
+
+    def set_search_params(self, params: str):
+        import faiss
+        faiss.ParameterSpace().set_index_parameters(self.index, params)
+
+    def close(self):
+        pass
+
+
+# Shard worker process state: one index per single-worker pool
+_worker_index = None
+
+
+def _load_worker_shard(path: str):
+    global _worker_index
+    import faiss
+    _worker_index = faiss.read_index(path, mmap_read_flags())
+    return _worker_index.ntotal
+
+
+def _worker_shard_size() -> int:
+    return _worker_index.ntotal
+
+
+def _search_worker_shard(queries: np.ndarray, k: int):
+    return _worker_index.search(queries, k)
+
+
+def _set_worker_search_params(params: str):
+    import faiss
+    faiss.ParameterSpace().set_index_parameters(_worker_index, params)
+
+
+class ProcessShard:
+    """A shard served by a dedicated local worker process that maps its index file"""
+
+    def __init__(self, path: str):
+        context = multiprocessing.get_context("spawn")
+        self.executor = ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                            initializer=_load_worker_shard, initargs=(path,))
+        # Waits for the worker to start and map its shard
+        self.ntotal = self.executor.submit(_worker_shard_size).result()
+
+    def submit(self, queries: np.ndarray, k: int) -> Future:
+        return self.executor.submit(_search_worker_shard, queries, k)
+
+    def set_search_params(self, params: str):
+        self.executor.submit(_set_worker_search_params, params).result()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ShardedIndex:
+    """Scatter-gather search over several FAISS indexes with the faiss search() interface.
+
+    Each shard holds a subset of the rows and maps its local ids back to
+    dataframe row numbers; every query goes to all shards in parallel and
+    the per-shard top-k lists are merged with a heap.
+    """
+
+    def __init__(self, shards: list, row_ids: List[np.ndarray], dimension: int):
+        self.shards = shards
+        self.row_ids = row_ids
+        self.d = dimension
+        # Private directory holding the shard files, removed on close
+        self.scratch_dir: Optional[str] = None
+
+    @property
+    def ntotal(self) -> int:
+        return sum(shard.ntotal for shard in self.shards)
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, partitions: List[np.ndarray],
+              build_index: Callable[[np.ndarray], object]) -> "ShardedIndex":
+        """Build one index per non-empty partition with the regular index builder"""
+        shards, row_ids = [], []
+        for rows in partitions:
+            if len(rows):
+                print(f"🔄 Building shard {len(shards)} ({len(rows)} rows)...")
+                shards.append(LocalShard(build_index(np.ascontiguousarray(embeddings[rows]))))
+                row_ids.append(rows.astype(np.int64))
+        return cls(shards, row_ids, embeddings.shape[1])
+
+    def save(self, write_atomic: Callable[[str, Callable[[str], None]], None]):
+        """Write every shard as its own index file plus its row-id map, via write_atomic(name, writer)"""
+        import faiss
+
+        for shard_no, (shard, rows) in enumerate(zip(self.shards, self.row_ids)):
+            def write_ids(path, rows=rows):
+                with open(path, "wb") as f:
+                    np.save(f, rows)
+
+            write_atomic(shard_index_file(shard_no), lambda path, shard=shard: faiss.write_index(shard.index, path))
+            write_atomic(shard_ids_file(shard_no), write_ids)
+
+    @classmethod
+    def load(cls, directory: str, shards: int, dimension: int, mode: str = RAG_SHARD_MODE) -> "ShardedIndex":
+        """Map saved shards in this process ("thread") or start one worker per shard ("process")"""
+        row_ids = [np.load(os.path.join(directory, shard_ids_file(i))) for i in range(shards)]
+        paths = [os.path.join(directory, shard_index_file(i)) for i in range(shards)]
+        if mode == "process":
+            print(f"🔄 Starting {shards} shard worker processes...")
+            return cls([ProcessShard(path) for path in paths], row_ids, dimension)
+
+        import faiss
+        flags = mmap_read_flags()
+        return cls([LocalShard(faiss.read_index(path, flags)) for path in paths], row_ids, dimension)
+
+    def set_search_params(self, params: str):
+        for shard in self.shards:
+            shard.set_search_params(params)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        futures = [shard.submit(queries, k) for shard in self.shards]
+        partials = [future.result() for future in futures]
+
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        for q in range(len(queries)):
+            # Each shard's list is already sorted best-first, so a k-way merge suffices
+            ranked = heapq.merge(
+                *(_shard_hits(shard_scores[q], shard_ids[q], rows)
+                  for (shard_scores, shard_ids), rows in zip(partials, self.row_ids)),
+                key=lambda hit: -hit[0],
+            )
+            for rank, (score, row) in enumerate(itertools.islice(ranked, k)):
+                scores[q, rank] = score
+                indices[q, rank] = row
+        return scores, indices
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+        if self.scratch_dir:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+            self.scratch_dir = None
@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+import numpy as np
+import os
+import secrets
+import threading
+import time
+
+from .metrics import CACHE_EVENTS
+
+load_dotenv()
+
+# Configuration
+SEARCH_SNAPSHOT_DEPTH = int(os.getenv("SEARCH_SNAPSHOT_DEPTH", "200"))
+SEARCH_SNAPSHOT_TTL_SECONDS = float(os.getenv("SEARCH_SNAPSHOT_TTL_SECONDS", "300"))
+SEARCH_SNAPSHOT_MAX = int(os.getenv("SEARCH_SNAPSHOT_MAX", "2048"))
+
+
+class SnapshotExpired(KeyError):
+    """Raised for a cursor whose snapshot expired, was evicted or never existed"""
+
+
+class SearchSnapshot:
+    """The ranked candidate list of one query: int32 rows + float32 scores (8 bytes per hit)"""
+
+    __slots__ = ("owner", "query", "ranked_query", "collection", "dataset_version", "rows", "scores", "expires_at")
+
+    def __init__(self, owner: str, query: str, collection: Optional[str], rows: np.ndarray, scores: np.ndarray,
+                 ranked_query: Optional[str] = None, dataset_version: Optional[str] = None):
+        valid = rows >= 0
+        self.owner = owner
+        self.query = query
+        # The wording the ranking (and its cached explanations) belongs to, when the semantic cache answered
+        self.ranked_query = ranked_query or query
+        self.collection = collection
+        # Row numbers only mean something against the dataset they were ranked on
+        self.dataset_version = dataset_version
+        self.rows = rows[valid].astype(np.int32)
+        self.scores = scores[valid].astype(np.float32)
+        self.expires_at = time.monotonic() + SEARCH_SNAPSHOT_TTL_SECONDS
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def page(self, offset: int, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.scores[offset:offset + limit], self.rows[offset:offset + limit]
+
+
+class SnapshotStore:
+    """Short-lived snapshots addressed by opaque cursors, bounded by TTL and an LRU size cap"""
+
+    def __init__(self, max_entries: int = SEARCH_SNAPSHOT_MAX):
+        self.max_entries = max_entries
+        self._snapshots: "OrderedDict[str, SearchSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, snapshot: SearchSnapshot) -> str:
+        snapshot_id = secrets.token_urlsafe(12)
+        with self._lock:
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def get(self, snapshot_id: str, owner: str) -> SearchSnapshot:
+        with self._lock:
+            snapshot = self._snapshots.get(snapshot_id)
+            if snapshot is not None and snapshot.expires_at < time.monotonic():
+                del self._snapshots[snapshot_id]
+                snapshot = None
+            # Cursors are only valid for the user who ran the search
+            if snapshot is None or snapshot.owner != owner:
+                CACHE_EVENTS.labels("search_snapshot", "miss").inc()
+                raise SnapshotExpired(snapshot_id)
+            self._snapshots.move_to_end(snapshot_id)
+        CACHE_EVENTS.labels("search_snapshot", "hit").inc()
+        return snapshot
+
+
+def encode_cursor(snapshot_id: str, offset: int) -> str:
+    return f"{snapshot_id}.{offset}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    snapshot_id, _, offset = cursor.rpartition(".")
+    if not snapshot_id or not offset.isdigit():
+        raise ValueError("Malformed cursor")
+    return snapshot_id, int(offset)
+
+
+# Global snapshot store
+snapshot_store = SnapshotStore()
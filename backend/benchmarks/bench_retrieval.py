@@ -0,0 +1,242 @@
+"""Reproducible retrieval benchmark for RAGService.
+
+For every dataset size it generates (or reuses) a fixed-seed synthetic dataset
+and measures dataset load time, embedding throughput, index build time, memory
+and search latency percentiles for each encoder backend x FAISS index spec.
+Gemini is never called: explanations use the rule-based fallback so the
+numbers reflect retrieval only.
+
+    python -m benchmarks.bench_retrieval --sizes 1000,100000,1000000 \\
+        --index-specs "Flat;HNSW32;IVF1024,SQ8" --output bench.json
+    python -m benchmarks.bench_retrieval --sizes 1000 --compare bench.json
+    python -m benchmarks.bench_retrieval --sizes 1000 --semantic-cache
+"""
+import argparse
+import importlib
+import json
+import random
+import sys
+import time
+import numpy as np
+
+from app.datastore import load_precomputed_embeddings
+from app.encoders import load_encoder
+from app.profiler import rss_mb
+from app.rag import RAGService
+from app.semantic_cache import SEMANTIC_CACHE_THRESHOLD, SemanticQueryCache
+from prometheus_client import REGISTRY
+from .common import (
+    CACHE_MODES, configure_caches, latency_summary, run_metadata, sample_queries, synthetic_dataset,
+    write_report,
+)
+
+# Metrics checked by --compare; all are "lower is better"
+COMPARED_METRICS = [
+    ("load_seconds",),
+    ("index_build_seconds",),
+    ("index_search", "p95_ms"),
+    ("search_founders", "p95_ms"),
+]
+
+
+def paraphrases(queries, seed: int):
+    """The same queries with their words shuffled - equivalent intent, different text"""
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(q.split(), len(q.split()))) for q in queries]
+
+
+def semantic_cache_hits() -> float:
+    return REGISTRY.get_sample_value("rag_cache_events_total", {"cache": "semantic_query", "result": "hit"}) or 0.0
+
+
+def bench_semantic_cache(service, queries, args) -> dict:
+    """End-to-end latency with the semantic cache on: originals warm it, paraphrases measure hits"""
+    service.query_cache = SemanticQueryCache(service.index.d)
+    for query in queries:
+        service.search_founders(query, args.k)
+
+    hits_before = semantic_cache_hits()
+    times = []
+    for query in paraphrases(queries, args.seed):
+        _, seconds = timed(service.search_founders, query, args.k)
+        times.append(seconds)
+    service.query_cache = None
+    return {
+        "threshold": SEMANTIC_CACHE_THRESHOLD,
+        "paraphrase_hit_rate": round((semantic_cache_hits() - hits_before) / len(queries), 4),
+        "search_founders": latency_summary(times),
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_size(rows: int, args, encoders: dict) -> list:
+    results = []
+    use_model = args.embeddings == "model" or (args.embeddings == "auto" and rows <= args.max_model_rows)
+    path = synthetic_dataset(rows, args.seed, None if use_model else next(iter(encoders.values())).dimension)
+
+    # pandas is imported lazily; load it first so load_seconds and dataset_rss_mb cover parsing only
+    importlib.import_module("pandas")
+    service = RAGService()
+    rss_before = rss_mb()
+    loaded, load_seconds = timed(service.load_dataset, path)
+    if not loaded:
+        raise RuntimeError(f"Failed to load {path}")
+    dataset_rss_mb = rss_mb() - rss_before
+    queries = sample_queries(service.founders_df, args.queries, args.seed)
+
+    for backend, encoder in encoders.items():
+        # Embedding throughput on a fixed sample of rows
+        sample_texts = service.founder_texts()[:args.encode_sample]
+        _, encode_seconds = timed(encoder.encode, sample_texts)
+
+        query_encode_times = []
+        query_vectors = []
+        for query in queries:
+            vector, seconds = timed(encoder.encode, [query])
+            query_encode_times.append(seconds)
+            query_vectors.append(vector[0])
+        query_vectors = np.ascontiguousarray(query_vectors, dtype=np.float32)
+        query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+
+        if use_model:
+            embeddings, embed_seconds = timed(service._build_embeddings, encoder)
+        else:
+            # Deterministic unit vectors written by the dataset generator alongside the rows
+            synthetic_dataset(rows, args.seed, encoder.dimension)
+            embeddings = load_precomputed_embeddings(path, rows, encoder, allow_synthetic=True)
+            embed_seconds = None
+
+        for spec in args.index_specs:
+            rss_before = rss_mb()
+            index, build_seconds = timed(service._build_index, embeddings, spec, args.search_params)
+            index_rss_mb = rss_mb() - rss_before
+
+            service.model, service.index, service.embeddings = encoder, index, embeddings
+            # Earlier specs and sizes must not warm this run's caches
+            configure_caches(args.caches, service)
+
+            search_times = []
+            for vector in query_vectors:
+                _, seconds = timed(index.search, vector[None, :], args.k)
+                search_times.append(seconds)
+
+            end_to_end_times = []
+            for query in queries:
+                _, seconds = timed(service.search_founders, query, args.k)
+                end_to_end_times.append(seconds)
+
+            result = {
+                "rows": rows,
+                "encoder": backend,
+                "index": spec,
+                "search_params": args.search_params,
+                "embeddings": "model" if use_model else "synthetic",
+                "caches": args.caches,
+                "k": args.k,
+                "load_seconds": round(load_seconds, 4),
+                "dataset_rss_mb": round(dataset_rss_mb, 1),
+                "encode_rows_per_second": round(len(sample_texts) / encode_seconds, 1),
+                "embed_all_seconds": round(embed_seconds, 4) if embed_seconds is not None else None,
+                "index_build_seconds": round(build_seconds, 4),
+                "index_rss_mb": round(index_rss_mb, 1),
+                "process_rss_mb": round(rss_mb(), 1),
+                "query_encode": latency_summary(query_encode_times),
+                "index_search": latency_summary(search_times),
+                "search_founders": latency_summary(end_to_end_times),
+            }
+            if args.semantic_cache:
+                result["semantic_cache"] = bench_semantic_cache(service, queries, args)
+            results.append(result)
+            print(f"✅ rows={rows} encoder={backend} index={spec} "
+                  f"search p95={result['index_search']['p95_ms']}ms "
+                  f"end-to-end p95={result['search_founders']['p95_ms']}ms")
+
+            service.index = None
+            del index
+
+        del embeddings
+    return results
+
+
+def compare(report: dict, baseline_path: str, tolerance: float) -> bool:
+    """Print metric ratios against a baseline report; False if any regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(r):
+        # Cache-off and cold-cache runs measure different things and are never compared
+        return r["rows"], r["encoder"], r["index"], r.get("search_params", ""), r.get("caches")
+
+    baseline_results = {key(r): r for r in baseline["results"]}
+    ok = True
+    matched = 0
+    for result in report["results"]:
+        previous = baseline_results.get(key(result))
+        if previous is None:
+            continue
+        matched += 1
+        for path in COMPARED_METRICS:
+            current, before = result, previous
+            for part in path:
+                current, before = current.get(part), before.get(part)
+            if not current or not before:
+                continue
+            ratio = current / before
+            regressed = ratio > 1 + tolerance
+            ok = ok and not regressed
+            print(f"{'❌' if regressed else '✅'} {key(result)} {'.'.join(path)}: "
+                  f"{before} -> {current} ({ratio:.2f}x)")
+    if not matched:
+        print(f"⚠️ No result in {baseline_path} matches this run's sizes, encoders, specs and cache mode")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RAGService retrieval")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated dataset sizes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--encoders", default="torch", help="Comma-separated encoder backends (torch, onnx)")
+    parser.add_argument("--index-specs", default="Flat", help="Semicolon-separated faiss.index_factory specs")
+    parser.add_argument("--search-params", default="", help="faiss ParameterSpace string, e.g. nprobe=16")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--encode-sample", type=int, default=1000, help="Rows encoded to measure throughput")
+    parser.add_argument("--embeddings", choices=["auto", "model", "synthetic"], default="auto")
+    parser.add_argument("--max-model-rows", type=int, default=100_000,
+                        help="In auto mode, larger datasets use synthetic embeddings")
+    parser.add_argument("--caches", choices=CACHE_MODES, default="off",
+                        help="Explanation and semantic query caches: off, or on but emptied before each run (cold)")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Also measure end-to-end search on reworded queries with the semantic cache on")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown ratio for --compare")
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(",")]
+    args.index_specs = [s.strip() for s in args.index_specs.split(";") if s.strip()]
+
+    encoders = {backend: load_encoder(backend) for backend in args.encoders.split(",")}
+    caches = configure_caches(args.caches)
+
+    results = []
+    for rows in args.sizes:
+        results.extend(bench_size(rows, args, encoders))
+
+    report = {
+        "benchmark": "retrieval",
+        "meta": run_metadata(seed=args.seed, queries=args.queries, caches=caches),
+        "results": results,
+    }
+    write_report(report, args.output)
+
+    if args.compare and not compare(report, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Shared helpers for the benchmark and evaluation scripts.
+
+Run the scripts from the backend directory, e.g.
+``python -m benchmarks.bench_retrieval --sizes 1000``.
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "data")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+
+def latency_summary(samples_seconds: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max in milliseconds"""
+    if not samples_seconds:
+        return {}
+    samples = np.asarray(samples_seconds) * 1000
+    return {
+        "count": int(len(samples)),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+        "max_ms": round(float(samples.max()), 4),
+    }
+
+
+def run_metadata(**extra) -> dict:
+    """Environment details stored with every report so runs are comparable"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    import faiss
+    return {
+        "git_commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "faiss": faiss.__version__,
+        **extra,
+    }
+
+
+def synthetic_dataset(rows: int, seed: int = 42, embedding_dimension: Optional[int] = None,
+                      workers: Optional[int] = None) -> str:
+    """Path to a generated dataset of the given size, cached between runs.
+
+    Built with the parallel, chunked generator. With embedding_dimension it
+    also carries a synthetic <dataset>.embeddings.npy sidecar of that size.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"founders_{rows}_seed{seed}.csv")
+    vectors_path, manifest_path = os.path.splitext(path)[0] + ".embeddings.npy", os.path.splitext(path)[0] + ".embeddings.json"
+    if os.path.exists(path) and embedding_dimension is not None:
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        if manifest.get("source") != "synthetic" or manifest.get("dimension") != embedding_dimension:
+            os.remove(path)
+
+    if not os.path.exists(path):
+        sys.path.insert(0, DATA_DIR)
+        from generate_dataset import write_dataset
+
+        embeddings = "synthetic" if embedding_dimension is not None else None
+        print(f"🔄 Generating {rows} synthetic founders (seed {seed}, embeddings: {embeddings})...")
+        # Generated under a scratch name; the dataset file is moved into place last
+        scratch = os.path.join(CACHE_DIR, f".tmp-{os.getpid()}")
+        os.makedirs(scratch, exist_ok=True)
+        tmp_path = os.path.join(scratch, os.path.basename(path))
+        write_dataset(tmp_path, rows, seed, workers=workers or os.cpu_count() or 1,
+                      embeddings=embeddings, dimension=embedding_dimension or 384)
+        if embeddings:
+            os.replace(os.path.splitext(tmp_path)[0] + ".embeddings.npy", vectors_path)
+            os.replace(os.path.splitext(tmp_path)[0] + ".embeddings.json", manifest_path)
+        os.replace(tmp_path, path)
+        os.rmdir(scratch)
+    return path
+
+
+# "off" measures every request end to end; "cold" keeps the caches on but starts them empty
+CACHE_MODES = ["off", "cold"]
+
+
+def configure_caches(mode: str, service=None) -> dict:
+    """Empty the explanation and semantic query caches and enable them only in "cold" mode.
+
+    Call before each measured run so earlier runs (other index specs, other
+    sizes) cannot warm it. Returns the settings for the report metadata.
+    """
+    from app.explanations import explanation_cache
+    from app.semantic_cache import (
+        SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL_SECONDS, SemanticQueryCache,
+    )
+
+    explanation_cache.clear()
+    explanation_cache.enabled = mode == "cold" and explanation_cache.max_entries > 0
+    semantic = mode == "cold" and SEMANTIC_CACHE_SIZE > 0
+    if service is not None:
+        service.query_cache = SemanticQueryCache(service.index.d) if semantic and service.index is not None else None
+    return {
+        "mode": mode,
+        "explanation_cache": {"enabled": explanation_cache.enabled, "size": explanation_cache.max_entries,
+                              "ttl_seconds": explanation_cache.ttl},
+        "semantic_cache": {"enabled": semantic, "size": SEMANTIC_CACHE_SIZE, "threshold": SEMANTIC_CACHE_THRESHOLD,
+                           "ttl_seconds": SEMANTIC_CACHE_TTL_SECONDS},
+    }
+
+
+def sample_queries(founders_df, count: int, seed: int = 42) -> List[str]:
+    """Natural-language queries assembled from the dataset's structured fields"""
+    rng = random.Random(seed)
+    templates = [
+        "{keyword} {role} in {location}",
+        "{stage} {keyword} startup",
+        "{role} working on {keyword} at {stage} stage",
+        "{keyword} founders in {location}",
+    ]
+    rows = founders_df.sample(n=min(count, len(founders_df)), random_state=seed, replace=count > len(founders_df))
+    queries = []
+    for _, row in rows.iterrows():
+        queries.append(rng.choice(templates).format(
+            keyword=rng.choice([k.strip() for k in row["keywords"].split(",")]),
+            role=row["role"].lower(),
+            location=row["location"],
+            stage=row["stage"],
+        ))
+    return queries
+
+
+def write_report(report: dict, output: Optional[str]):
+    """Write a JSON report to a file, or stdout when no path is given"""
+    payload = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(payload + "\n")
+        print(f"✅ Report written to {output}")
+    else:
+        print(payload)
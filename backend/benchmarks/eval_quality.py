@@ -0,0 +1,250 @@
+"""Retrieval quality evaluation for RAGService index configurations.
+
+Labeled queries are built from the structured fields of the dataset: a query
+names a keyword plus a stage and/or location, and every row matching all of
+those fields is relevant (graded by how many of the fields match, for nDCG).
+Each configuration is scored on recall@k, nDCG@k and MRR against those labels.
+Agreement with the exact baseline (the torch encoder over an unsharded
+IndexFlatIP, searched once) is reported as overlap@k, next to build time, index
+memory and search latency. A configuration is "spec|search params|options",
+where options pick the encoder (torch, onnx, onnx-int8) and shard count, so
+quantization and sharding are measured against the same reference.
+
+    python -m benchmarks.eval_quality --configs "HNSW32|efSearch=16;HNSW32|efSearch=64|encoder=onnx-int8;Flat||shards=4" \\
+        --queries 300 --output quality.json
+"""
+import argparse
+import math
+import random
+import time
+import numpy as np
+from typing import Dict, List, Tuple
+
+from app.encoders import load_encoder
+from app.profiler import rss_mb
+from app.rag import RAGService
+from app.sharding import ShardedIndex, partition_rows
+from .common import latency_summary, run_metadata, synthetic_dataset, write_report
+
+# Encoder name -> (load_encoder backend, quantized)
+ENCODERS = {"torch": ("torch", False), "onnx": ("onnx", False), "onnx-int8": ("onnx", True)}
+BASELINE = {"index": "Flat", "search_params": "", "encoder": "torch", "shards": 1}
+
+
+def split_keywords(value: str) -> List[str]:
+    return [k.strip().lower() for k in str(value).split(",") if k.strip()]
+
+
+def build_labeled_queries(founders_df, count: int, seed: int) -> List[dict]:
+    """Queries with known relevant rows, derived from keyword + stage + location"""
+    rng = random.Random(seed)
+    keywords = founders_df["keywords"].map(split_keywords).tolist()
+    stages = founders_df["stage"].str.lower().tolist()
+    locations = founders_df["location"].str.lower().tolist()
+
+    shapes = [
+        ("{keyword} founders at {stage} stage in {location}", ("keyword", "stage", "location")),
+        ("{stage} {keyword} startups", ("keyword", "stage")),
+        ("{keyword} people based in {location}", ("keyword", "location")),
+    ]
+
+    queries = []
+    anchors = rng.sample(range(len(founders_df)), min(count, len(founders_df)))
+    for anchor in anchors:
+        template, fields = rng.choice(shapes)
+        target = {
+            "keyword": rng.choice(keywords[anchor]),
+            "stage": stages[anchor],
+            "location": locations[anchor],
+        }
+
+        # Grade every row by how many of the query's fields it matches
+        relevance: Dict[int, int] = {}
+        for row in range(len(founders_df)):
+            matched = (("keyword" in fields and target["keyword"] in keywords[row])
+                       + ("stage" in fields and stages[row] == target["stage"])
+                       + ("location" in fields and locations[row] == target["location"]))
+            if matched:
+                relevance[row] = matched
+        relevant = {row for row, grade in relevance.items() if grade == len(fields)}
+
+        queries.append({
+            "query": template.format(**target),
+            "fields": list(fields),
+            "relevant": relevant,
+            "grades": relevance,
+        })
+    return queries
+
+
+def recall_at_k(retrieved: List[int], relevant: set, k: int) -> float:
+    """Relevant hits in the top k over the most that could fit (min(k, |relevant|))"""
+    if not relevant:
+        return 0.0
+    return len(set(retrieved[:k]) & relevant) / min(k, len(relevant))
+
+
+def ndcg_at_k(retrieved: List[int], grades: Dict[int, int], k: int) -> float:
+    dcg = sum(grades.get(row, 0) / math.log2(rank + 2) for rank, row in enumerate(retrieved[:k]))
+    ideal = sorted(grades.values(), reverse=True)[:k]
+    idcg = sum(grade / math.log2(rank + 2) for rank, grade in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def reciprocal_rank(retrieved: List[int], relevant: set) -> float:
+    for rank, row in enumerate(retrieved):
+        if row in relevant:
+            return 1.0 / (rank + 1)
+    return 0.0
+
+
+def parse_configs(value: str, encoder: str = "torch", shards: int = 1) -> List[dict]:
+    """'spec|search params|encoder=...,shards=...' entries; encoder and shards default to the CLI flags"""
+    configs = [BASELINE]
+    for part in value.split(";"):
+        if not part.strip():
+            continue
+        spec, _, rest = part.partition("|")
+        params, _, options = rest.partition("|")
+        config = {"index": spec.strip(), "search_params": params.strip(), "encoder": encoder, "shards": shards}
+        for option in filter(None, (o.strip() for o in options.split(","))):
+            name, _, option_value = option.partition("=")
+            if name == "encoder" and option_value in ENCODERS:
+                config["encoder"] = option_value
+            elif name == "shards" and option_value.isdigit() and int(option_value) >= 1:
+                config["shards"] = int(option_value)
+            else:
+                raise ValueError(f"Unknown config option '{option}' in '{part}'")
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+
+class EncodedDataset:
+    """Row and query embeddings per encoder, computed on first use and shared by every config"""
+
+    def __init__(self, service: RAGService, queries: List[dict]):
+        self.service = service
+        self.queries = queries
+        self._encoded: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def get(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        if name not in self._encoded:
+            backend, quantized = ENCODERS[name]
+            encoder = load_encoder(backend, quantized)
+            # Sidecar embeddings would hand torch vectors to the onnx/int8 configs
+            embeddings = self.service._build_embeddings(encoder, precomputed=False)
+            query_vectors = np.ascontiguousarray(encoder.encode([q["query"] for q in self.queries]), dtype=np.float32)
+            query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+            self._encoded[name] = (embeddings, query_vectors)
+        return self._encoded[name]
+
+
+def build_config_index(service: RAGService, embeddings: np.ndarray, config: dict, shard_by: str):
+    """One index for the config, or config["shards"] of them behind a ShardedIndex"""
+    def build(rows: np.ndarray):
+        return service._build_index(rows, config["index"], config["search_params"])
+
+    if config["shards"] <= 1:
+        return build(embeddings)
+    partitions = partition_rows(service.founders_df, config["shards"], shard_by)
+    return ShardedIndex.build(embeddings, partitions, build)
+
+
+def search_all(index, query_vectors: np.ndarray, depth: int) -> Tuple[List[List[int]], List[float]]:
+    hits, search_times = [], []
+    for vector in query_vectors:
+        start = time.perf_counter()
+        _, indices = index.search(vector[None, :], depth)
+        search_times.append(time.perf_counter() - start)
+        hits.append([int(i) for i in indices[0] if i >= 0])
+    return hits, search_times
+
+
+def evaluate(args) -> dict:
+    service = RAGService()
+    path = args.dataset or synthetic_dataset(args.rows, args.seed)
+    if not service.load_dataset(path):
+        raise RuntimeError(f"Failed to load {path}")
+
+    queries = build_labeled_queries(service.founders_df, args.queries, args.seed)
+    encoded = EncodedDataset(service, queries)
+    depth = max(args.k)
+
+    baseline_hits = None
+    results = []
+    # BASELINE comes first, so its hits are the exact reference every config is compared with
+    for config in parse_configs(args.configs, args.encoder, args.shards):
+        embeddings, query_vectors = encoded.get(config["encoder"])
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        index = build_config_index(service, embeddings, config, args.shard_by)
+        build_seconds = time.perf_counter() - start
+        index_rss_mb = rss_mb() - rss_before
+
+        hits, search_times = search_all(index, query_vectors, depth)
+        if config == BASELINE:
+            baseline_hits = hits
+
+        metrics = {}
+        for k in args.k:
+            metrics[f"recall@{k}"] = np.mean([recall_at_k(h, q["relevant"], k) for h, q in zip(hits, queries)])
+            metrics[f"ndcg@{k}"] = np.mean([ndcg_at_k(h, q["grades"], k) for h, q in zip(hits, queries)])
+            metrics[f"overlap@{k}"] = np.mean([len(set(h[:k]) & set(b[:k])) / k for h, b in zip(hits, baseline_hits)])
+        metrics["mrr"] = np.mean([reciprocal_rank(h, q["relevant"]) for h, q in zip(hits, queries)])
+
+        results.append({
+            **config,
+            "baseline": config == BASELINE,
+            **{name: round(float(value), 4) for name, value in metrics.items()},
+            "index_build_seconds": round(build_seconds, 4),
+            "index_rss_mb": round(index_rss_mb, 1),
+            "index_search": latency_summary(search_times),
+        })
+        if isinstance(index, ShardedIndex):
+            index.close()
+        del index
+
+    return {
+        "benchmark": "quality",
+        "meta": run_metadata(seed=args.seed, dataset=path, rows=len(service.founders_df), baseline=BASELINE,
+                             shard_by=args.shard_by, queries=len(queries), k=args.k),
+        "results": results,
+    }
+
+
+def print_table(report: dict, k: int):
+    print(f"\n{'index':<24}{'params':<16}{'encoder':<11}{'shards':>7}{'recall@' + str(k):>10}{'ndcg@' + str(k):>10}"
+          f"{'mrr':>8}{'overlap@' + str(k):>12}{'p95 ms':>10}{'MB':>8}")
+    for r in report["results"]:
+        print(f"{r['index']:<24}{r['search_params'] or '-':<16}{r['encoder']:<11}{r['shards']:>7}"
+              f"{r[f'recall@{k}']:>10.3f}{r[f'ndcg@{k}']:>10.3f}"
+              f"{r['mrr']:>8.3f}{r[f'overlap@{k}']:>12.3f}{r['index_search']['p95_ms']:>10.3f}"
+              f"{r['index_rss_mb']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality per index configuration")
+    parser.add_argument("--dataset", help="Dataset CSV (default: generate --rows synthetic rows)")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--encoder", choices=sorted(ENCODERS), default="torch",
+                        help="Encoder for configs that do not name one; the baseline always uses torch")
+    parser.add_argument("--shards", type=int, default=1, help="Shard count for configs that do not name one")
+    parser.add_argument("--shard-by", default="id", help="Column rows are sharded by (RAG_SHARD_BY)")
+    parser.add_argument("--configs", default="HNSW32|efSearch=16;HNSW32|efSearch=64;IVF64,Flat|nprobe=4;IVF64,SQ8|nprobe=8",
+                        help="Semicolon-separated 'index_factory spec|search params|encoder=...,shards=...'; "
+                             "torch + Flat is always the baseline")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", default="5,10,20", help="Comma-separated cutoffs")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    args.k = [int(k) for k in args.k.split(",")]
+
+    report = evaluate(args)
+    write_report(report, args.output)
+    print_table(report, args.k[0])
+
+
+if __name__ == "__main__":
+    main()
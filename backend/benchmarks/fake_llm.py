@@ -0,0 +1,46 @@
+"""Local stand-in for the Gemini GenerativeModel used by RAGService.
+
+It implements only ``generate_content(prompt).text``, with tunable latency and
+error rate, so load tests exercise the explanation path without network calls
+or API spend.
+"""
+import random
+import re
+import threading
+import time
+
+
+class FakeGeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str) -> FakeGeminiResponse:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+
+        # Blocks the calling thread exactly like the real synchronous client
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("Fake Gemini error (injected)")
+
+        keywords = re.search(r"- Keywords: (.*)", prompt)
+        role = re.search(r"- Role: (.*)", prompt)
+        return FakeGeminiResponse(
+            f"Matched on keywords: {keywords.group(1).strip() if keywords else 'n/a'} "
+            f"and role: {role.group(1).strip() if role else 'n/a'}."
+        )
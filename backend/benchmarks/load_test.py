@@ -0,0 +1,290 @@
+"""End-to-end HTTP load test for the FastAPI app.
+
+Drives a weighted mix of /search, /founder/{id}, /stats and /auth/login at a
+fixed concurrency and reports throughput, p50/p95/p99 latency per endpoint and
+event-loop lag as JSON. Gemini is replaced by benchmarks.fake_llm with tunable
+latency and error rate.
+
+Modes:
+  inprocess  ASGI transport, client and app share one event loop (lag includes client work)
+  localhost  uvicorn on 127.0.0.1 in a background thread with its own loop (lag is the server's)
+  url        an already running server (--url); no Gemini stub and no lag probe
+
+    python -m benchmarks.load_test --mode localhost --concurrency 32 --duration 30 \\
+        --mix search=70,founder=15,stats=10,login=5 --llm-latency-ms 400 --output load.json
+
+The per-user login rate limit is lifted in inprocess/localhost modes so login
+traffic measures bcrypt cost rather than 429s; pass --keep-login-rate-limit to
+keep it. Search queries are sampled from the dataset (--queries distinct ones)
+and the explanation and semantic query caches are off unless --caches cold, so
+--llm-latency-ms and --llm-error-rate apply to every search.
+"""
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from .common import CACHE_MODES, configure_caches, latency_summary, run_metadata, sample_queries, write_report
+from .fake_llm import FakeGeminiModel
+
+DEMO_USERS = ["demo", "admin", "reviewer"]
+DEMO_PASSWORD = "demo"
+# Used against --mode url, where the dataset is not available to sample from
+SEARCH_QUERIES = [
+    "healthtech founder in India with AI background",
+    "fintech startup in pre-seed stage",
+    "marketplace founder with Series A funding",
+    "investor specializing in SaaS and developer tools",
+    "climate tech entrepreneur looking for a technical co-founder",
+    "blockchain engineer at seed stage",
+    "edtech product manager",
+    "robotics and IoT founders",
+]
+
+
+class LoopLagProbe:
+    """Measures how late a periodic sleep wakes up - time the loop spent blocked"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self.running = True
+
+    async def run(self):
+        while self.running:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+
+class ServerThread(threading.Thread):
+    """uvicorn on localhost with its own event loop and lag probe"""
+
+    def __init__(self, app, port: int, probe: LoopLagProbe):
+        super().__init__(daemon=True)
+        import uvicorn
+
+        self.probe = probe
+        # lifespan is off: the harness has already run startup and installed the LLM stub
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+        self.server = uvicorn.Server(config)
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.create_task(self.probe.run())
+        loop.run_until_complete(self.server.serve())
+
+    def stop(self):
+        self.probe.running = False
+        self.server.should_exit = True
+        self.join(timeout=10)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - {"search", "founder", "stats", "login"}
+    if unknown:
+        raise ValueError(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args, founder_ids: List[str], queries: List[str]):
+        self.client = client
+        self.args = args
+        self.founder_ids = founder_ids
+        self.queries = queries
+        self.mix = parse_mix(args.mix)
+        self.token: Optional[str] = None
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.status_codes: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def login(self) -> str:
+        response = await self.client.post("/auth/login", json={"username": "demo", "password": DEMO_PASSWORD})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    def _request(self, operation: str, rng: random.Random):
+        headers = {"Authorization": f"Bearer {self.token}"}
+        if operation == "search":
+            body = {"query": rng.choice(self.queries), "limit": self.args.limit}
+            return self.client.post("/search", json=body, headers=headers)
+        if operation == "founder":
+            return self.client.get(f"/founder/{rng.choice(self.founder_ids)}", headers=headers)
+        if operation == "stats":
+            return self.client.get("/stats", headers=headers)
+        body = {"username": rng.choice(DEMO_USERS), "password": DEMO_PASSWORD}
+        return self.client.post("/auth/login", json=body)
+
+    async def worker(self, worker_id: int, deadline: float):
+        rng = random.Random(self.args.seed + worker_id)
+        operations, weights = zip(*self.mix.items())
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            if operation == "founder" and not self.founder_ids:
+                continue
+            start = time.perf_counter()
+            try:
+                response = await self._request(operation, rng)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            self.latencies[operation].append(time.perf_counter() - start)
+            self.status_codes[operation][status] += 1
+            if not 200 <= status < 300:
+                self.errors[operation] += 1
+
+    async def run(self) -> float:
+        self.token = await self.login()
+        start = time.perf_counter()
+        deadline = start + self.args.duration
+        await asyncio.gather(*(self.worker(i, deadline) for i in range(self.args.concurrency)))
+        return time.perf_counter() - start
+
+    def summary(self, elapsed: float) -> dict:
+        all_latencies = [s for samples in self.latencies.values() for s in samples]
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "requests": len(all_latencies),
+            "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+            "errors": sum(self.errors.values()),
+            "latency": latency_summary(all_latencies),
+            "operations": {
+                operation: {
+                    "requests": len(samples),
+                    "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                    "errors": self.errors[operation],
+                    "status_codes": {str(k): v for k, v in self.status_codes[operation].items()},
+                    "latency": latency_summary(samples),
+                }
+                for operation, samples in sorted(self.latencies.items())
+            },
+        }
+
+
+def prepare_app(args):
+    """Start the RAG system in this process, swap Gemini for the stub and set up the caches"""
+    from app import auth
+    from app.main import app
+    from app.rag import rag_service
+
+    if not rag_service.startup():
+        raise RuntimeError("RAG startup failed")
+    llm = FakeGeminiModel(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate, args.seed)
+    rag_service.gemini_model = llm
+    if not args.keep_login_rate_limit:
+        auth.LOGIN_RATE_LIMIT = 1 << 30
+
+    caches = configure_caches(args.caches, rag_service)
+
+    founder_ids = rag_service.founders_df["id"].sample(
+        n=min(1000, len(rag_service.founders_df)), random_state=args.seed).tolist()
+    queries = sample_queries(rag_service.founders_df, args.queries, args.seed)
+    return app, llm, founder_ids, queries, caches
+
+
+async def discover_founder_ids(client: httpx.AsyncClient, token: str) -> List[str]:
+    response = await client.post("/search", json={"query": SEARCH_QUERIES[0], "limit": 20},
+                                 headers={"Authorization": f"Bearer {token}"})
+    return [r["id"] for r in response.json()] if response.status_code == 200 else []
+
+
+async def run(args) -> dict:
+    llm = None
+    probe = LoopLagProbe(args.lag_interval_ms / 1000)
+    server = None
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.mode == "url":
+        client = httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits)
+        founder_ids, queries, caches = [], SEARCH_QUERIES, None
+        probe = None
+    else:
+        app, llm, founder_ids, queries, caches = prepare_app(args)
+        if args.mode == "inprocess":
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                       timeout=timeout)
+            probe_task = asyncio.create_task(probe.run())
+        else:
+            port = free_port()
+            server = ServerThread(app, port, probe)
+            server.start()
+            while not server.server.started:
+                await asyncio.sleep(0.05)
+            client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=timeout, limits=limits)
+
+    try:
+        test = LoadTest(client, args, founder_ids, queries)
+        if args.mode == "url":
+            test.founder_ids = await discover_founder_ids(client, await test.login())
+        elapsed = await test.run()
+    finally:
+        await client.aclose()
+        if probe is not None:
+            probe.running = False
+        if server is not None:
+            server.stop()
+        elif args.mode == "inprocess":
+            await probe_task
+
+    report = {
+        "benchmark": "load_test",
+        "meta": run_metadata(
+            seed=args.seed, mode=args.mode, concurrency=args.concurrency, duration=args.duration,
+            mix=parse_mix(args.mix), limit=args.limit, queries=len(set(queries)), caches=caches,
+            llm={"latency_ms": args.llm_latency_ms, "jitter_ms": args.llm_jitter_ms,
+                 "error_rate": args.llm_error_rate} if llm else None,
+        ),
+        "results": test.summary(elapsed),
+        "event_loop_lag": latency_summary(probe.samples) if probe else None,
+    }
+    if llm:
+        report["llm"] = {"calls": llm.calls, "errors": llm.errors}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load test for the Founder RAG API")
+    parser.add_argument("--mode", choices=["inprocess", "localhost", "url"], default="localhost")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL in --mode url")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of traffic")
+    parser.add_argument("--mix", default="search=70,founder=15,stats=10,login=5",
+                        help="Weighted operations: search, founder, stats, login")
+    parser.add_argument("--limit", type=int, default=5, help="Results per /search")
+    parser.add_argument("--queries", type=int, default=500, help="Distinct search queries sampled from the dataset")
+    parser.add_argument("--caches", choices=CACHE_MODES, default="off",
+                        help="Explanation and semantic query caches: off, or on but starting empty (cold)")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--lag-interval-ms", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--keep-login-rate-limit", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
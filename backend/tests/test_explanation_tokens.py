@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("jose")
+pytest.importorskip("passlib")
+
+from app.auth import create_explanation_token, verify_explanation_token
+
+
+def test_round_trip():
+    token = create_explanation_token("demo", "eu", "fintech founders in Berlin", "F123")
+    assert verify_explanation_token(token, "demo") == ("eu", "fintech founders in Berlin", "F123")
+
+
+def test_non_ascii_query_round_trips():
+    token = create_explanation_token("demo", None, "gründer in München", "F7")
+    assert verify_explanation_token(token, "demo") == (None, "gründer in München", "F7")
+
+
+def test_rejects_other_users():
+    token = create_explanation_token("demo", None, "climate tech", "F42")
+    assert verify_explanation_token(token, "reviewer") is None
+
+
+def test_rejects_expired_tokens():
+    token = create_explanation_token("demo", None, "climate tech", "F42", expires_at=int(time.time()) - 1)
+    assert verify_explanation_token(token, "demo") is None
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda t: t[:-1] + ("A" if t[-1] != "A" else "B"),  # tampered signature
+    lambda t: "e" + t[1:] if t[0] != "e" else "f" + t[1:],  # tampered payload
+    lambda t: t[:len(t) // 2],  # truncated
+    lambda t: t.partition(".")[0],  # signature missing
+    lambda t: t + "é",  # non-ASCII in signature
+    lambda t: "ü" + t,  # non-ASCII in payload
+    lambda t: "\udcff" + t,  # lone surrogate
+    lambda t: "",
+])
+def test_rejects_invalid_tokens(mutate):
+    token = create_explanation_token("demo", None, "climate tech", "F42")
+    assert verify_explanation_token(mutate(token), "demo") is None
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("jose")
+pytest.importorskip("passlib")
+
+from fastapi import HTTPException
+
+from app import auth
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiter(monkeypatch):
+    monkeypatch.setattr(auth, "_login_attempts", {})
+    monkeypatch.setattr(auth, "authenticate_user", lambda username, password: False)
+
+
+def login(username):
+    return asyncio.run(auth.authenticate_user_async(username, "wrong"))
+
+
+def test_unknown_users_are_not_tracked():
+    for i in range(100):
+        assert login(f"user{i}") is False
+    assert auth._login_attempts == {}
+
+
+def test_known_user_is_limited():
+    for _ in range(auth.LOGIN_RATE_LIMIT):
+        assert login("admin") is False
+    with pytest.raises(HTTPException) as excinfo:
+        login("admin")
+    assert excinfo.value.status_code == 429
+
+
+def test_busy_rejection_does_not_count_as_attempt(monkeypatch):
+    monkeypatch.setattr(auth, "_pending_logins", auth.LOGIN_MAX_PENDING)
+    with pytest.raises(HTTPException) as excinfo:
+        login("admin")
+    assert excinfo.value.status_code == 503
+    assert not auth._login_attempts.get("admin")
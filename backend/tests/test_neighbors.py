@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from app import neighbors
+from app.neighbors import build_knn_graph, refresh_knn_graph
+
+
+def _unit_vectors(rng, rows, dimension=16):
+    vectors = rng.standard_normal((rows, dimension)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _flat_index(embeddings):
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+    return index
+
+
+def _brute_force(embeddings, k):
+    similarity = embeddings @ embeddings.T
+    np.fill_diagonal(similarity, -np.inf)
+    rows = np.argsort(-similarity, axis=1, kind="stable")[:, :k]
+    return rows, np.take_along_axis(similarity, rows, axis=1)
+
+
+def test_build_matches_brute_force():
+    embeddings = _unit_vectors(np.random.default_rng(0), 300)
+    graph = build_knn_graph(_flat_index(embeddings), embeddings, k=5, batch_size=64, threads=2)
+
+    rows, scores = _brute_force(embeddings, 5)
+    np.testing.assert_array_equal(graph.neighbors, rows)
+    np.testing.assert_allclose(graph.scores, scores, atol=1e-5)
+
+
+def test_incremental_update_matches_full_build(monkeypatch):
+    rng = np.random.default_rng(1)
+    previous = _unit_vectors(rng, 400)
+    graph = build_knn_graph(_flat_index(previous), previous, k=8, batch_size=64, threads=1)
+
+    # Edit a few rows and append some new ones
+    embeddings = np.concatenate([previous, _unit_vectors(rng, 15)])
+    embeddings[[3, 77, 250]] = _unit_vectors(rng, 3)
+
+    def no_full_rebuild(*args, **kwargs):
+        raise AssertionError("expected an incremental update")
+
+    monkeypatch.setattr(neighbors, "build_knn_graph", no_full_rebuild)
+    updated = refresh_knn_graph(_flat_index(embeddings), embeddings, 8, (previous, graph))
+
+    rows, scores = _brute_force(embeddings, 8)
+    np.testing.assert_array_equal(updated.neighbors, rows)
+    np.testing.assert_allclose(updated.scores, scores, atol=1e-5)
+
+
+def test_removed_rows_fall_back_to_full_build():
+    rng = np.random.default_rng(2)
+    previous = _unit_vectors(rng, 200)
+    graph = build_knn_graph(_flat_index(previous), previous, k=4)
+
+    embeddings = np.ascontiguousarray(previous[:150])
+    rebuilt = refresh_knn_graph(_flat_index(embeddings), embeddings, 4, (previous, graph))
+
+    rows, _ = _brute_force(embeddings, 4)
+    np.testing.assert_array_equal(rebuilt.neighbors, rows)
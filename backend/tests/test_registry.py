@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from app.registry import CollectionRegistry, begin_request_leases
+
+
+class FakeService:
+    def __init__(self, name, memory_bytes=0):
+        self.name = name
+        self.memory_bytes = memory_bytes
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = CollectionRegistry(FakeService("default"), {"a": "a.csv", "b": "b.csv"}, budget_mb=1.5)
+    monkeypatch.setattr(registry, "_load", lambda name: FakeService(name, memory_bytes=1_000_000))
+    return registry
+
+
+def test_unleased_collection_closes_on_eviction(registry):
+    a = registry.get("a")
+    registry.get("b")
+    assert a.closed
+    assert registry.resident("a") is None
+
+
+def test_leased_collection_closes_after_last_release(registry):
+    a = registry.get("a", lease=True)
+    registry.get("a", lease=True)
+    registry.get("b")
+
+    # Evicted from the LRU but still in use
+    assert registry.resident("a") is None
+    assert not a.closed
+    registry.release(a)
+    assert not a.closed
+    registry.release(a)
+    assert a.closed
+
+
+def test_request_leases_collect_non_default_services(registry):
+    leases = begin_request_leases()
+    a = registry.lease("a")
+    assert registry.lease(None) is registry.default_service
+    assert leases == [a]
+
+    registry.get("b")
+    assert not a.closed
+    for service in leases:
+        registry.release(service)
+    assert a.closed
+
+
+def test_close_includes_retired_collections(registry):
+    a = registry.get("a", lease=True)
+    b = registry.get("b")
+    registry.close()
+    assert a.closed and b.closed and registry.default_service.closed
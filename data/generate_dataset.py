@@ -1,4 +1,10 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from faker import Faker
 import uuid
 import random
@@ -206,7 +212,7 @@ def generate_founder_data():
     """Generate a single founder record"""
     
     # Basic info
-    founder_id = str(uuid.uuid4())
+    founder_id = str(uuid.UUID(int=random.getrandbits(128), version=4))  # seeded, unlike uuid4()
     gender = random.choice(['male', 'female'])
     first_name = fake.first_name_male() if gender == 'male' else fake.first_name_female()
     last_name = fake.last_name()
@@ -363,39 +369,201 @@ def generate_founder_data():
         'notes': notes
     }
 
-def main():
-    """Generate the complete dataset"""
-    print("Generating 700 founder records...")
+COLUMNS = ['id', 'founder_name', 'email', 'role', 'company', 'location',
+           'idea', 'about', 'keywords', 'stage', 'linkedin', 'notes']
+
+def chunk_seed(seed, chunk):
+    """Seed of one chunk; chunk 0 uses the base seed"""
+    return seed + chunk * 1_000_003
+
+def generate_chunk(task):
+    """Generate one chunk in a worker process - its rows depend only on (seed, chunk, rows)"""
+    seed, chunk, num_rows = task
+    Faker.seed(chunk_seed(seed, chunk))
+    random.seed(chunk_seed(seed, chunk))
+    return pd.DataFrame([generate_founder_data() for _ in range(num_rows)], columns=COLUMNS)
+
+def generate_chunks(num_rows, seed=42, chunk_rows=50_000, workers=1):
+    """Yield the dataset in order, chunk by chunk; at most 2 x workers chunks are held in memory"""
+    tasks = [(seed, chunk, min(chunk_rows, num_rows - start))
+             for chunk, start in enumerate(range(0, num_rows, chunk_rows))]
+    if workers <= 1:
+        for task in tasks:
+            yield generate_chunk(task)
+        return
     
-    # Generate all records
-    founders_data = []
-    for i in range(700):
-        founder = generate_founder_data()
-        founders_data.append(founder)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = [pool.submit(generate_chunk, task) for task in tasks[:2 * workers]]
+        next_task = len(pending)
+        while pending:
+            chunk = pending.pop(0).result()
+            if next_task < len(tasks):
+                pending.append(pool.submit(generate_chunk, tasks[next_task]))
+                next_task += 1
+            yield chunk
+
+class DatasetWriter:
+    """Appends chunks to a CSV, Parquet or Arrow IPC file (chosen by extension)"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower().lstrip(".")
+        self._file = None
+        self._writer = None
+    
+    def write(self, chunk):
+        if self.format in ("parquet", "arrow"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            table = pa.Table.from_pandas(chunk, schema=pa.schema([(c, pa.string()) for c in COLUMNS]),
+                                         preserve_index=False)
+            if self._writer is None:
+                if self.format == "parquet":
+                    self._writer = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+                else:
+                    self._file = pa.OSFile(self.path, "wb")
+                    self._writer = pa.ipc.new_file(self._file, table.schema)
+            self._writer.write_table(table)
+        else:
+            if self._file is None:
+                self._file = open(self.path, "w", newline="")
+                chunk.to_csv(self._file, index=False)
+            else:
+                chunk.to_csv(self._file, index=False, header=False)
+    
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Content hash of the written dataset; the API only loads embeddings whose manifest matches it"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class EmbeddingsWriter:
+    """Streams embeddings for each chunk into <dataset>.embeddings.npy plus a JSON manifest.
+    
+    "synthetic" writes deterministic random unit vectors (fast capacity-test
+    fixtures); "model" encodes each row with the backend's encoder so the
+    API can skip encoding at startup.
+    """
+    
+    def __init__(self, dataset_path, num_rows, source, seed, dimension=384):
+        import numpy as np
+        
+        self.dataset_path = dataset_path
+        self.source = source
+        self.seed = seed
+        self.encoder = None
+        if source == "model":
+            # The backend defines the encoder and the embedded text of a row
+            sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+            from app.encoders import load_encoder
+            
+            self.encoder = load_encoder()
+            dimension = self.encoder.dimension
+        
+        base = os.path.splitext(dataset_path)[0]
+        self.vectors_path, self.manifest_path = f"{base}.embeddings.npy", f"{base}.embeddings.json"
+        self.vectors = np.lib.format.open_memmap(self.vectors_path, mode="w+", dtype=np.float32,
+                                                 shape=(num_rows, dimension))
+        self.offset = 0
+        self.chunk = 0
+    
+    def write(self, chunk):
+        import numpy as np
         
-        if (i + 1) % 100 == 0:
-            print(f"Generated {i + 1} records...")
+        if self.encoder is not None:
+            from app.rag import founder_text
+            
+            vectors = np.asarray(self.encoder.encode([founder_text(row) for _, row in chunk.iterrows()]),
+                                 dtype=np.float32)
+        else:
+            rng = np.random.default_rng(chunk_seed(self.seed, self.chunk))
+            vectors = rng.standard_normal((len(chunk), self.vectors.shape[1]), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        
+        self.vectors[self.offset:self.offset + len(chunk)] = vectors
+        self.offset += len(chunk)
+        self.chunk += 1
     
-    # Create DataFrame
-    df = pd.DataFrame(founders_data)
+    def close(self):
+        """Call after the dataset file is complete: the manifest records its content hash"""
+        self.vectors.flush()
+        with open(self.manifest_path, "w") as f:
+            json.dump({
+                "rows": int(self.vectors.shape[0]),
+                "dimension": int(self.vectors.shape[1]),
+                "source": self.source,
+                "model": self.encoder.model_name if self.encoder is not None else None,
+                "backend": self.encoder.backend if self.encoder is not None else None,
+                "quantized": self.encoder.quantized if self.encoder is not None else None,
+                "seed": self.seed,
+                "dataset_sha256": file_sha256(self.dataset_path),
+            }, f, indent=2)
+        print(f"Embeddings saved as '{self.vectors_path}'")
+
+def write_dataset(output, num_rows, seed=42, chunk_rows=50_000, workers=1, embeddings=None, dimension=384):
+    """Generate and stream a dataset to disk in bounded memory; returns (first chunk, stats)"""
+    writer = DatasetWriter(output)
+    vectors = EmbeddingsWriter(output, num_rows, embeddings, seed, dimension) if embeddings else None
+    first_chunk = None
+    written = 0
+    roles, stages = pd.Series(dtype=int), pd.Series(dtype=int)
+    try:
+        for chunk in generate_chunks(num_rows, seed, chunk_rows, workers):
+            writer.write(chunk)
+            if vectors is not None:
+                vectors.write(chunk)
+            if first_chunk is None:
+                first_chunk = chunk.head()
+            roles = roles.add(chunk['role'].value_counts(), fill_value=0)
+            stages = stages.add(chunk['stage'].value_counts(), fill_value=0)
+            written += len(chunk)
+            print(f"Generated {written} records...")
+    finally:
+        writer.close()
+        if vectors is not None:
+            vectors.close()
+    return first_chunk, {"roles": roles.astype(int), "stages": stages.astype(int)}
+
+def main():
+    """Generate the complete dataset"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic founders dataset")
+    parser.add_argument("--rows", type=int, default=700, help="Number of founder records")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible output")
+    parser.add_argument("--output", default="founders_dataset.csv",
+                        help="Output path; .csv, .parquet or .arrow")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Generator processes")
+    parser.add_argument("--chunk-rows", type=int, default=50_000,
+                        help="Rows per chunk; output depends on --seed and --chunk-rows, never on --workers")
+    parser.add_argument("--embeddings", choices=["synthetic", "model"],
+                        help="Also write <output>.embeddings.npy (synthetic unit vectors, or the backend encoder)")
+    parser.add_argument("--dimension", type=int, default=384, help="Dimension of synthetic embeddings")
+    args = parser.parse_args()
     
-    # Save to CSV
-    df.to_csv('founders_dataset.csv', index=False)
-    print(f"Dataset saved as 'founders_dataset.csv'")
-    print(f"Dataset shape: {df.shape}")
+    print(f"Generating {args.rows} founder records with {args.workers} worker(s)...")
+    head, stats = write_dataset(args.output, args.rows, args.seed, args.chunk_rows, args.workers,
+                                args.embeddings, args.dimension)
+    print(f"Dataset saved as '{args.output}'")
     
     # Display first few rows for verification
     print("\nFirst 5 rows:")
-    print(df.head())
+    print(head)
     
     # Show data quality stats
     print(f"\nDataset Statistics:")
-    print(f"Total records: {len(df)}")
-    print(f"Unique companies: {df['company'].nunique()}")
+    print(f"Total records: {args.rows}")
     print(f"Role distribution:")
-    print(df['role'].value_counts())
+    print(stats["roles"])
     print(f"\nStage distribution:")
-    print(df['stage'].value_counts())
+    print(stats["stages"])
 
 if __name__ == "__main__":
     main()
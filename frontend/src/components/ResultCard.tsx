@@ -1,9 +1,12 @@
 import { useState } from 'react'
-import type { FounderResult } from '../types'
+import type { FounderResult, SimilarFounder } from '../types'
 
 interface Props {
   result: FounderResult
   onShowMore: (id: string) => void
+  onExplain?: (result: FounderResult) => void
+  explanation?: string
+  similar?: SimilarFounder[]
   expanded?: boolean
   details?: {
     about: string
@@ -14,11 +17,15 @@ interface Props {
   }
 }
 
-export default function ResultCard({ result, onShowMore, expanded = false, details }: Props) {
+export default function ResultCard({ result, onShowMore, onExplain, explanation, similar, expanded = false, details }: Props) {
   const [isExpanded, setIsExpanded] = useState(expanded)
 
   const toggle = () => {
-    if (!isExpanded) onShowMore(result.id)
+    if (!isExpanded) {
+      onShowMore(result.id)
+      // Full AI explanation is only generated for cards the user opens
+      if (result.explanation_token && !explanation) onExplain?.(result)
+    }
     setIsExpanded((v) => !v)
   }
 
@@ -31,7 +38,7 @@ export default function ResultCard({ result, onShowMore, expanded = false, detai
         </div>
         <div className="provenance">ID: {result.id} · Row: {result.row_id}</div>
       </div>
-      <div className="snippet">{result.snippet}</div>
+      <div className="snippet">{explanation ?? result.snippet}</div>
       <div className="matched">Matched on: {result.matched_fields.join(', ')}</div>
       <button className="link-btn" onClick={toggle}>{isExpanded ? 'Hide details' : 'Show more'}</button>
       {isExpanded && details && (
@@ -41,6 +48,9 @@ export default function ResultCard({ result, onShowMore, expanded = false, detai
           <p><strong>Keywords:</strong> {details.keywords}</p>
           <p><strong>LinkedIn:</strong> <a href={details.linkedin} target="_blank" rel="noreferrer">{details.linkedin}</a></p>
           {details.notes && <p><strong>Notes:</strong> {details.notes}</p>}
+          {similar && similar.length > 0 && (
+            <p><strong>Similar founders:</strong> {similar.map((s) => `${s.founder_name} (${s.company})`).join(' · ')}</p>
+          )}
         </div>
       )}
     </div>
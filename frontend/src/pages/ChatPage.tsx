@@ -1,7 +1,7 @@
 import { useEffect, useMemo, useRef, useState } from 'react'
 import { Link } from 'react-router-dom'
 import api from '../lib/api'
-import type { FounderDetails, FounderResult, SearchQuery } from '../types'
+import type { ExplainResponse, FounderDetails, FounderResult, SearchQuery, SimilarFounder } from '../types'
 import ResultCard from '../components/ResultCard'
 import { useAuth } from '../context/AuthContext'
 
@@ -14,6 +14,8 @@ export default function ChatPage() {
   const [error, setError] = useState<string | null>(null)
   const [results, setResults] = useState<FounderResult[]>([])
   const [detailsMap, setDetailsMap] = useState<Record<string, FounderDetails | undefined>>({})
+  const [explanations, setExplanations] = useState<Record<string, string | undefined>>({})
+  const [similarMap, setSimilarMap] = useState<Record<string, SimilarFounder[] | undefined>>({})
   const cacheRef = useRef<Map<string, FounderResult[]>>(new Map())
   const debounceRef = useRef<ReturnType<typeof setTimeout> | null>(null)
   const sentinelRef = useRef<HTMLDivElement | null>(null)
@@ -43,11 +45,12 @@ export default function ChatPage() {
       if (cached) {
         setResults(cached)
       } else {
-        const payload: SearchQuery = { query: cleanedQuery, limit }
+        const payload: SearchQuery = { query: cleanedQuery, limit, explain: 'lazy' }
         const { data } = await api.post<FounderResult[]>('/search', payload)
         cacheRef.current.set(key, data)
         setResults(data)
       }
+      setExplanations({})
       setPage(1)
     } catch (err) {
       const message = (err as { response?: { data?: { detail?: string } } })?.response?.data?.detail
@@ -73,14 +76,27 @@ export default function ChatPage() {
   const fetchDetails = async (id: string) => {
     if (detailsMap[id]) return
     try {
-      const { data } = await api.get<FounderDetails>(`/founder/${id}`)
+      const [{ data }, similar] = await Promise.all([
+        api.get<FounderDetails>(`/founder/${id}`),
+        // Precomputed neighbours; a failure just hides the list
+        api.get<SimilarFounder[]>(`/founder/${id}/similar`, { params: { limit: 5 } }).catch(() => null),
+      ])
       setDetailsMap((m) => ({ ...m, [id]: data }))
+      if (similar) setSimilarMap((m) => ({ ...m, [id]: similar.data }))
     } catch {
       // ignore
     }
   }
 
-  
+  const fetchExplanation = async (result: FounderResult) => {
+    if (!result.explanation_token || explanations[result.id]) return
+    try {
+      const { data } = await api.post<ExplainResponse>('/explain', { token: result.explanation_token })
+      setExplanations((m) => ({ ...m, [result.id]: data.snippet }))
+    } catch {
+      // keep the quick snippet
+    }
+  }
 
   // IntersectionObserver to auto-load next page
   useEffect(() => {
@@ -134,6 +150,9 @@ export default function ChatPage() {
             key={r.id}
             result={r}
             onShowMore={fetchDetails}
+            onExplain={fetchExplanation}
+            explanation={explanations[r.id]}
+            similar={similarMap[r.id]}
             details={detailsMap[r.id] ? {
               about: detailsMap[r.id]!.about,
               idea: detailsMap[r.id]!.idea,
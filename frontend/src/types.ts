@@ -6,6 +6,8 @@ export interface TokenResponse {
 export interface SearchQuery {
   query: string
   limit?: number
+  // 'lazy' returns quick snippets plus explanation tokens for /explain
+  explain?: 'eager' | 'lazy'
 }
 
 export interface FounderResult {
@@ -18,6 +20,22 @@ export interface FounderResult {
   similarity_score: number
   matched_fields: string[]
   row_id: number
+  explanation_token?: string | null
+}
+
+export interface SimilarFounder {
+  id: string
+  founder_name: string
+  role: string
+  company: string
+  location: string
+  similarity_score: number
+  row_id: number
+}
+
+export interface ExplainResponse {
+  founder_id: string
+  snippet: string
 }
 
 export interface FounderDetails {